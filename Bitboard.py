@@ -0,0 +1,124 @@
+"""Bitboard representation of the game state, an alternative backend for the search algos.
+"""
+import numpy as np
+
+
+def popcount(bits):
+    return bin(bits).count('1')
+
+
+class Bitboard:
+    """The board as Python ints, bit i * width + j is the cell (i, j), with the attributes and functions of GameState
+    that the search algos use (pos, rival_pos, succ, perform_move, hash_key...), so it can be searched instead.
+    """
+
+    def __init__(self, board, fruits_dict):
+        """
+        input:
+            - board: np.array, a 2D matrix of the board, as given to the players.
+            - fruits_dict: dict of {pos: value} of the fruits on board.
+        """
+        self.height, self.width = board.shape
+        self.full = (1 << board.size) - 1
+        first_col = sum(1 << (i * self.width) for i in range(self.height))
+        last_col = first_col << (self.width - 1)
+        self.not_first_col = self.full & ~first_col
+        self.not_last_col = self.full & ~last_col
+
+        self.visited = self.bits(zip(*np.where(board == -1)))
+        i, j = np.where(board == 1)
+        self.pos = (int(i[0]), int(j[0]))
+        i, j = np.where(board == 2)
+        self.rival_pos = (int(i[0]), int(j[0]))
+        self.free = self.full & ~self.visited & ~self.bits([self.pos, self.rival_pos])
+
+        self.fruits_dict = dict(fruits_dict)
+        self.fruits = self.bits(self.fruits_dict)
+        self.fruits_ate = {1: {}, 2: {}}
+        self.ate = {1: 0, 2: 0}  # bits of the fruits eaten by each player
+        self.scores = {1: 0, 2: 0}
+        self.start_time = None
+        self.time_limit = None
+
+    def bit(self, pos):
+        return 1 << (int(pos[0]) * self.width + int(pos[1]))
+
+    def bits(self, poses):
+        bits = 0
+        for pos in poses:
+            bits |= self.bit(pos)
+        return bits
+
+    def neighbors(self, bits):
+        """Returns the bits of all the cells next to the given cells (free or not).
+        """
+        return ((((bits << self.width) | (bits >> self.width)) & self.full)
+                | ((bits << 1) & self.not_first_col)
+                | ((bits >> 1) & self.not_last_col))
+
+    def mobility(self, pos):
+        """Returns the number of moves from pos.
+        """
+        return popcount(self.neighbors(self.bit(pos)) & self.free)
+
+    def reachable(self, pos, depth):
+        """Returns the number of free cells that can be reached from pos in at most depth steps (pos included).
+        """
+        reached = self.bit(pos)
+        for _ in range(depth):
+            frontier = self.neighbors(reached) & self.free & ~reached
+            if not frontier:
+                break
+            reached |= frontier
+        return popcount(reached)
+
+    def succ(self, pos):
+        i, j = pos
+        bit = self.bit(pos)
+        free = self.free
+        next_poses = []
+        # same order as utils.get_directions()
+        if (bit << self.width) & free:
+            next_poses.append((i + 1, j))
+        if (bit << 1) & free & self.not_first_col:
+            next_poses.append((i, j + 1))
+        if (bit >> self.width) & free:
+            next_poses.append((i - 1, j))
+        if (bit >> 1) & free & self.not_last_col:
+            next_poses.append((i, j - 1))
+        return next_poses
+
+    def perform_move(self, pos, next_pos):
+        player_index = 1 if self.pos == pos else 2
+        assert player_index == 1 or self.rival_pos == pos
+        bit, next_bit = self.bit(pos), self.bit(next_pos)
+
+        if not self.visited & next_bit:  # moving forward
+            assert self.free & next_bit
+            self.visited |= bit
+            self.free &= ~next_bit
+            if self.fruits & next_bit:
+                fruit_val = self.fruits_dict.pop(next_pos)
+                self.fruits &= ~next_bit
+                self.fruits_ate[player_index][next_pos] = fruit_val
+                self.ate[player_index] |= next_bit
+                self.scores[player_index] += fruit_val
+
+        else:  # returning backward
+            self.visited &= ~next_bit
+            self.free |= bit
+            if self.ate[player_index] & bit:
+                fruit_val = self.fruits_ate[player_index].pop(pos)
+                self.fruits_dict[pos] = fruit_val
+                self.fruits |= bit
+                self.ate[player_index] &= ~bit
+                self.scores[player_index] -= fruit_val
+
+        if player_index == 1:
+            self.pos = next_pos
+        else:
+            self.rival_pos = next_pos
+
+    def hash_key(self, maximizing_player):
+        return hash((self.visited, self.pos, self.rival_pos, self.fruits, self.ate[1], self.ate[2],
+                     maximizing_player))
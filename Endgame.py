@@ -0,0 +1,157 @@
+"""Exact endgame solver, for when the players are walled off from each other.
+"""
+import operator
+import time
+import numpy as np
+from Bitboard import Bitboard, popcount
+import utils
+
+
+class EndgameSolver:
+    """Once the players are walled off from each other the best a player can do is the best walk in its own region,
+    scored by the fruits it eats and the penalties decided by its length against the rival's longest walk.
+    The walk is found exactly, by a depth first search with a memo kept for the game and branch and bound.
+    """
+
+    def __init__(self, board, penalty_score, max_nodes=200000, max_entries=2 ** 18):
+        """
+        input:
+            - board: np.array, a 2D matrix of the board, as given in set_game_params.
+            - penalty_score: the penalty of a player that gets stuck.
+            - max_nodes: the maximum number of searched nodes for a move, above it the move is not solved.
+            - max_entries: the maximum number of walks in the memo.
+        """
+        self.geometry = Bitboard(board, {})  # only the shifts and masks of the board shape are used
+        height, width = board.shape
+        self.black = self.geometry.bits((i, j) for i in range(height) for j in range(width) if (i + j) % 2 == 0)
+        self.fruits_moves = 2 * min(board.shape)  # the moves of the game after which the fruits are removed
+        self.penalty_score = penalty_score
+        self.max_nodes = max_nodes
+        self.memo = utils.EvalCache(max_entries)
+        self.fruit_values = {}  # fruit bit -> value
+        self.nodes = 0
+        self.aborted = False
+        self.deadline = None
+
+    def pos(self, bit):
+        return divmod(bit.bit_length() - 1, self.geometry.width)
+
+    def region(self, bit, free):
+        """Returns the bits of the free cells that can be reached from the cell of bit (not included).
+        """
+        reached = bit
+        while True:
+            frontier = self.geometry.neighbors(reached) & free & ~reached
+            if not frontier:
+                return reached & ~bit
+            reached |= frontier
+
+    def upper_bound(self, bit, region):
+        """Returns an upper bound on the length of a walk from the cell of bit into region:
+        the cells of a walk alternate between the checkerboard colors.
+        """
+        same_color = self.black if bit & self.black else self.geometry.full & ~self.black
+        same = popcount(region & same_color)
+        other = popcount(region) - same
+        return 2 * same + 1 if other > same else 2 * other
+
+    def fruits_value(self, fruits):
+        """Returns the value of all the fruits of the given bits.
+        """
+        return sum(value for fruit_bit, value in self.fruit_values.items() if fruits & fruit_bit)
+
+    def penalties(self, length, need):
+        """Returns the score of the penalties of a walk of the given length, need being the length R' of the rival.
+        """
+        if length < need:
+            return -self.penalty_score
+        return self.penalty_score if length > need else 0
+
+    def longest(self, bit, region, fruits, need, lifetime):
+        """Returns (score, length) of the best walk from the cell of bit into region,
+        region being all the free cells that can be reached from it, need the length R' of the rival's walk
+        from the same turn (at least -1: all the walks longer than it score the same)
+        and lifetime the number of moves of the walk before the fruits are removed.
+        """
+        fruits = fruits & region if lifetime > 0 else 0
+        if not fruits:
+            lifetime = 0
+        key = (bit, region, fruits, need, lifetime)
+        best = self.memo.lookup(key)
+        if best is not None:
+            return best
+
+        self.nodes += 1
+        if self.nodes > self.max_nodes or (self.nodes % 1024 == 0 and time.time() > self.deadline):
+            self.aborted = True
+        if self.aborted:
+            return 0, 0
+
+        # the moves to the cells with less ways out first, they tend to start the longest walks
+        moves = []
+        next_bits = self.geometry.neighbors(bit) & region
+        while next_bits:
+            next_bit = next_bits & -next_bits
+            next_bits ^= next_bit
+            moves.append((popcount(self.geometry.neighbors(next_bit) & region), next_bit))
+        moves.sort()
+
+        best = (self.penalties(0, need), 0)
+        for _, next_bit in moves:
+            next_region = self.region(next_bit, region & ~next_bit)
+            max_length = 1 + self.upper_bound(next_bit, next_region)
+            max_value = self.fruits_value(fruits & (next_region | next_bit))
+            bound = (max_value + self.penalties(max_length, need), max_length)
+            if bound <= best:
+                continue
+            score, length = self.longest(next_bit, next_region, fruits, max(need - 1, -1), lifetime - 1)
+            best = max(best, (score + self.fruits_value(fruits & next_bit), length + 1))
+
+        if not self.aborted:
+            self.memo.store(key, best)
+        return best
+
+    def solve(self, state):
+        """Returns the direction of the player's best move if the players are walled off from each other
+        and the player's region was solved in time, else None.
+        The search stops 200 ms before the state's time limit.
+        """
+        board = state.board
+        free = self.geometry.bits(zip(*np.where((board != -1) & (board != 1) & (board != 2))))
+        bit, rival_bit = self.geometry.bit(state.pos), self.geometry.bit(state.rival_pos)
+        region, rival_region = self.region(bit, free), self.region(rival_bit, free)
+        if not region or region & rival_region:
+            return None
+
+        fruits = 0
+        for fruit_pos in zip(*np.where(board > 2)):
+            fruit_bit = self.geometry.bit(fruit_pos)
+            fruits |= fruit_bit
+            self.fruit_values[fruit_bit] = board[fruit_pos]
+
+        buffer = 200
+        self.deadline = state.start_time + state.time_limit - buffer / 1000
+        self.nodes = 0
+        self.aborted = False
+        # the length of the rival's longest walk: with no fruits and no penalties all its walks score 0
+        _, rival_length = self.longest(rival_bit, rival_region, 0, -1, 0)
+        first = state.undo_depth == 0 or state.undo_stack[0][0] == 1
+        # the game ends after the turn of the second player, so a walk as long as the rival's one penalizes both
+        # players if the player moved first, else the player walks one more move than the rival to penalize it only
+        need = rival_length if first else rival_length + 1
+        # the moves of the player are every other move of the game, from this one
+        lifetime = max(0, (self.fruits_moves - state.undo_depth + 1) // 2)
+        best, best_move = None, None
+        next_bits = self.geometry.neighbors(bit) & region
+        while next_bits:
+            next_bit = next_bits & -next_bits
+            next_bits ^= next_bit
+            next_region = self.region(next_bit, region & ~next_bit)
+            score, length = self.longest(next_bit, next_region, fruits, max(need - 1, -1), lifetime - 1)
+            if lifetime > 0:
+                score += self.fruits_value(fruits & next_bit)
+            if best is None or (score, length) > best:
+                best, best_move = (score, length), next_bit
+        if self.aborted:
+            return None
+        return tuple(map(operator.sub, self.pos(best_move), state.pos))
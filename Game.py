@@ -1,7 +1,3 @@
-import matplotlib.pyplot as plt
-from matplotlib.patches import Circle, Rectangle
-from matplotlib.animation import FuncAnimation
-from matplotlib.offsetbox import OffsetImage, AnnotationBbox
 import numpy as np
 import os
 import random
@@ -37,6 +33,7 @@ class Game:
         self.players_positions = players_positions
         self.players_score = [0 ,0] # init scores for each player
         self.directions = utils.get_directions()
+        self.neighbors = utils.neighbor_table((len(board), len(board[0])))
         # Fruits:
         fruits_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fruits_imgs')
         self.fruits_paths = [os.path.join(fruits_dir, fruit_file) for fruit_file in os.listdir(fruits_dir)]
@@ -46,73 +43,16 @@ class Game:
 
         self.animated = animated
         self.animation_func = animation_func
+        self.view = None
         
         if self.animated:
-            self.init_animation()
+            from GameView import GameView  # matplotlib is imported only for an animated game
+            self.view = GameView(self.map, self.players_positions, self.animation_func)
         self.create_fruits()
         self.players_positions = [tuple(reversed(position)) for position in self.players_positions]
 
-    def init_animation(self):
-        # Colors:
-        self.board_colors = {'free': 'gray', 'stepped on': 'gray'}
-        self.players_colors = ['blue', 'red']
-
-        aspect = len(self.map[0]) / len(self.map)
-        self.fig = plt.figure(frameon=False, figsize=(4 * aspect, 4))
-        self.ax = self.fig.add_subplot(111, aspect='equal')
-        self.fig.subplots_adjust(left=0, right=1, bottom=0, top=1, wspace=None, hspace=None)
-
-        # create boundary patch
-        x_min, y_min = -0.5, -0.5
-        x_max = len(self.map[0]) - 0.5
-        y_max = len(self.map) - 0.5
-        plt.xlim(x_min, x_max)
-        plt.ylim(y_min, y_max)
-        # patches = board_patch + map_patches + player_patches
-        self.board_patch = [Rectangle((x_min, y_min), x_max - x_min, y_max - y_min, facecolor='none', edgecolor='gray')]
-        self.map_patches = []
-        for i in range(len(self.map)):
-            self.map_patches.append([])
-            for j in range(len(self.map[0])):
-                if self.map[i][j] != 0:
-                    face_color = self.board_colors['stepped on']
-                    self.map_patches[i].append(
-                        Rectangle((j - 0.5, i - 0.5), 1, 1, facecolor=face_color, edgecolor='black', fill=True))
-                else:
-                    face_color = self.board_colors['free']
-                    self.map_patches[i].append(
-                        Rectangle((j - 0.5, i - 0.5), 1, 1, facecolor=face_color, edgecolor='black', fill=False))
-
-        # painting the starting positions of the players:
-        self.map_patches[self.players_positions[0][0]][self.players_positions[0][1]].fill = True
-        self.map_patches[self.players_positions[1][0]][self.players_positions[1][1]].fill = True
-        
-        # create players:
-        self.T = 0
-        self.players = []
-        self.player_patches = []
-        for i in range(len(self.players_positions)):
-            self.players.append(Circle(tuple(reversed(self.players_positions[i])), 0.3, facecolor=self.players_colors[i], edgecolor='black'))
-            self.players[i].original_face_color = self.players_colors[i]
-            self.player_patches.append(self.players[i])
-            self.T = max(self.T, len(self.players_positions[i]) - 1)
-        
-        global animation
-        animation = FuncAnimation(self.fig, self.animation_func,
-                                                 init_func=self.init_func,
-                                                 frames=int(self.T + 1) * 10,
-                                                 interval=600,  # change game speed anumation here
-                                                 blit=False)
-
-    @staticmethod
-    def start_game():
-        plt.show()
-
-
-    def init_func(self):
-        for p in self.board_patch + sum(self.map_patches, []) + self.player_patches:
-            self.ax.add_patch(p)
-        return self.board_patch + sum(self.map_patches, []) + self.players
+    def start_game(self):
+        self.view.show()
 
 
     def update_map(self, prev_pos, next_pos):
@@ -146,15 +86,11 @@ class Game:
 
 
     def add_fruit(self, pos):
-        if self.animated:
-            fruit_idx = random.randint(0, len(self.fruits_paths)-1)
-            fruit_path = self.fruits_paths[fruit_idx]
-            img = plt.imread(fruit_path)
-            off_img = OffsetImage(img, zoom = 0.3)
-            bbox = AnnotationBbox(off_img, (pos[1], pos[0]), frameon=False)
-            fruit = self.ax.add_artist(bbox)
-        else:
-            fruit = None
+        # the image is drawn from the random stream also when it is not shown, so a headless game places
+        # the same fruits as an animated one
+        fruit_idx = random.randint(0, len(self.fruits_paths)-1)
+        fruit_path = self.fruits_paths[fruit_idx]
+        fruit = self.view.add_fruit(pos, fruit_path) if self.animated else None
 
         # choose value of fruit and update the tracking map
         value = random.randint(3, self.max_fruit_score)
@@ -200,11 +136,7 @@ class Game:
         self.players_positions[self.turn] = pos
 
         if self.animated:
-            self.players[self.turn].center = pos
-            
-            i = pos[1]
-            j = pos[0]
-            self.map_patches[i][j].fill = True
+            self.view.move_player(self.turn, pos)
         
         return prev_pos
 
@@ -217,14 +149,12 @@ class Game:
 
         self.turn = 1 - self.turn
         if self.animated:
-            return self.board_patch + sum(self.map_patches, []) + self.players
+            return self.view.artists()
 
 
     def player_cant_move(self, player_id):
         player_pos = self.get_player_position(player_id)
-        all_next_positions = [utils.tup_add(player_pos, direction) for direction in self.directions]
-        possible_next_positions = [pos for pos in all_next_positions if self.pos_feasible_on_board(pos)]
-        return len(possible_next_positions) == 0
+        return not any(self.map[i][j] not in [-1, 1, 2] for i, j in self.neighbors[player_pos])
 
 
     def pos_feasible_on_board(self, pos):
@@ -244,7 +174,7 @@ class Game:
             return False
         
         prev_player_position = self.get_player_position_by_current(current = True)
-        if not any(utils.tup_add(prev_player_position, move) == pos for move in self.directions):
+        if pos not in self.neighbors[prev_player_position]:
             # print('moved from', prev_player_position, 'to', pos)
             return False
 
@@ -279,7 +209,7 @@ class Game:
         self.players_score[player_id] -= penalty
 
     def get_starting_state(self):
-        return self.board_patch + sum(self.map_patches, []) + self.players
+        return self.view.artists()
 
     def get_fruits_on_board(self):
         """ Returns a dictionary of pos:val
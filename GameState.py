@@ -0,0 +1,158 @@
+"""The game state shared by the search players.
+"""
+import numpy as np
+import utils
+
+
+class GameState:
+    """The board from the point of view of a player (1 is the player, 2 is the rival) with both positions,
+    the fruits and the fruits scores. A move is applied with apply() and taken back with undo(), in O(1)
+    and without allocating: the undo stack is allocated once and the fruit values are read from the board.
+    """
+    __slots__ = ['board', 'pos', 'rival_pos', 'fruits', 'fruits_score', 'rival_fruits_score', 'undo_stack',
+                 'undo_depth', 'directions', 'neighbors', 'zobrist', 'key', 'start_time', 'time_limit', 'debug']
+
+    def __init__(self, board, hashed=False, debug=False):
+        """
+        input:
+            - board: np.array, a 2D matrix of the board, as given in set_game_params. It is updated in place.
+            - hashed: whether to keep the Zobrist hash of the state (needed for hash_key).
+            - debug: whether to check the fruits scores after every move (slow).
+        """
+        self.board = board
+        pos = np.where(board == 1)
+        rival_pos = np.where(board == 2)
+        # convert pos to tuple of ints
+        self.pos = tuple(ax[0] for ax in pos)
+        self.rival_pos = tuple(ax[0] for ax in rival_pos)
+        # the fruits on the initial board are written in their cells
+        self.fruits = {(i, j): board[i, j] for i, j in zip(*np.where(board > 2))}
+        self.fruits_score = 0
+        self.rival_fruits_score = 0
+        self.undo_stack = [None] * board.size
+        self.undo_depth = 0
+        self.directions = utils.get_directions()
+        self.neighbors = utils.neighbor_table(board.shape)
+        self.zobrist = None
+        self.key = 0
+        if hashed:
+            self.zobrist = utils.Zobrist(board.shape)
+            self.key = self.zobrist.full_hash(board, self.fruits, {}, {})
+        self.start_time = None
+        self.time_limit = None
+        self.debug = debug
+
+    def set_fruits(self, fruits_on_board_dict):
+        """Replaces the fruits on board with the given ones: fruits that are gone from the board are cleared from
+        their cells and new fruits are written in their cells.
+        """
+        z = self.zobrist
+        for fruit_pos, value in self.fruits.items():
+            if self.board[fruit_pos] == value:  # not eaten
+                self.board[fruit_pos] = 0
+                if z is not None:
+                    self.key ^= z.fruit[fruit_pos]
+        self.fruits = dict(fruits_on_board_dict)
+        for fruit_pos, value in self.fruits.items():
+            self.board[fruit_pos] = value
+            if z is not None:
+                self.key ^= z.fruit[fruit_pos]
+
+    def load(self, other):
+        """Copies the position of another state of the same game (e.g. one sent to a worker process) into this state.
+        """
+        self.board[...] = other.board
+        self.pos, self.rival_pos = other.pos, other.rival_pos
+        self.fruits = dict(other.fruits)
+        self.fruits_score, self.rival_fruits_score = other.fruits_score, other.rival_fruits_score
+        self.undo_stack = list(other.undo_stack)
+        self.undo_depth = other.undo_depth
+        self.key = other.key
+        self.start_time, self.time_limit = other.start_time, other.time_limit
+
+    def succ(self, pos):
+        board = self.board
+        # the neighbors on board are precomputed, a move is legal if its cell is free
+        return [next_pos for next_pos in self.neighbors[pos] if board[next_pos] not in (-1, 1, 2)]
+
+    def apply(self, player_index, next_pos):
+        """Moves the player (1 or 2) to next_pos, eating the fruit there if there is one.
+        """
+        pos = self.pos if player_index == 1 else self.rival_pos
+        assert (self.board[next_pos] not in [-1, 1, 2])
+
+        fruit_val = self.board[next_pos] if self.board[next_pos] > 2 else 0
+        self.board[pos] = -1
+        self.board[next_pos] = player_index
+        self.undo_stack[self.undo_depth] = (player_index, pos, next_pos, fruit_val)
+        self.undo_depth += 1
+
+        if player_index == 1:
+            self.pos = next_pos
+            self.fruits_score += fruit_val
+        else:
+            self.rival_pos = next_pos
+            self.rival_fruits_score += fruit_val
+
+        if self.zobrist is not None:
+            self.key ^= self.key_delta(player_index, pos, next_pos, fruit_val)
+
+        if self.debug:
+            self.check_scores()
+
+    def undo(self):
+        """Takes back the last applied move.
+        """
+        self.undo_depth -= 1
+        player_index, pos, next_pos, fruit_val = self.undo_stack[self.undo_depth]
+
+        self.board[next_pos] = fruit_val
+        self.board[pos] = player_index
+
+        if player_index == 1:
+            self.pos = pos
+            self.fruits_score -= fruit_val
+        else:
+            self.rival_pos = pos
+            self.rival_fruits_score -= fruit_val
+
+        if self.zobrist is not None:
+            self.key ^= self.key_delta(player_index, pos, next_pos, fruit_val)
+
+        if self.debug:
+            self.check_scores()
+
+    def key_delta(self, player_index, pos, next_pos, fruit_val):
+        """Returns what a move (an entry of the undo stack) xors into the Zobrist hash, both when applied and undone.
+        """
+        z = self.zobrist
+        delta = z.player[player_index][pos] ^ z.blocked[pos] ^ z.player[player_index][next_pos]
+        if fruit_val:
+            delta ^= z.fruit[next_pos] ^ z.ate[player_index][next_pos]
+        return delta
+
+    def recompute_scores(self):
+        """Returns the fruits scores of the player and of the rival, summed over all the moves on the undo stack.
+        """
+        scores = {1: 0, 2: 0}
+        for player_index, _, _, fruit_val in self.undo_stack[:self.undo_depth]:
+            scores[player_index] += fruit_val
+        return scores[1], scores[2]
+
+    def check_scores(self):
+        assert (self.fruits_score, self.rival_fruits_score) == self.recompute_scores()
+
+    def perform_move(self, pos, next_pos):
+        """The perform move function for the search algos: moves the player at pos to next_pos,
+        or takes back the last move when next_pos is the cell the player came from.
+        """
+        if self.board[next_pos] == -1:  # returning backward
+            assert self.undo_stack[self.undo_depth - 1][1:3] == (next_pos, pos)
+            self.undo()
+        else:  # moving forward
+            self.apply(1 if pos == self.pos else 2, next_pos)
+
+    def hash_key(self, maximizing_player):
+        if maximizing_player:
+            return self.key
+        return self.key ^ self.zobrist.side
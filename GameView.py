@@ -0,0 +1,95 @@
+"""The matplotlib animation of a game, imported by Game only for an animated game:
+matplotlib takes most of the startup time of a game, and terminal games never import it.
+"""
+import matplotlib.pyplot as plt
+from matplotlib.patches import Circle, Rectangle
+from matplotlib.animation import FuncAnimation
+from matplotlib.offsetbox import OffsetImage, AnnotationBbox
+
+
+class GameView:
+    def __init__(self, board, players_positions, animation_func):
+        """Builds the figure of the board. The animation of the game is created by show(), when the game is shown:
+        an animation that is never rendered warns when it is deleted.
+        input:
+            - board: 2D np.array. The initial board.
+            - players_positions: the initial players positions, as (row, column).
+            - animation_func: the function doing the animation, called with the frame number.
+        """
+        # Colors:
+        self.board_colors = {'free': 'gray', 'stepped on': 'gray'}
+        self.players_colors = ['blue', 'red']
+
+        aspect = len(board[0]) / len(board)
+        self.fig = plt.figure(frameon=False, figsize=(4 * aspect, 4))
+        self.ax = self.fig.add_subplot(111, aspect='equal')
+        self.fig.subplots_adjust(left=0, right=1, bottom=0, top=1, wspace=None, hspace=None)
+
+        # create boundary patch
+        x_min, y_min = -0.5, -0.5
+        x_max = len(board[0]) - 0.5
+        y_max = len(board) - 0.5
+        plt.xlim(x_min, x_max)
+        plt.ylim(y_min, y_max)
+        # patches = board_patch + map_patches + player_patches
+        self.board_patch = [Rectangle((x_min, y_min), x_max - x_min, y_max - y_min, facecolor='none', edgecolor='gray')]
+        self.map_patches = []
+        for i in range(len(board)):
+            self.map_patches.append([])
+            for j in range(len(board[0])):
+                if board[i][j] != 0:
+                    face_color = self.board_colors['stepped on']
+                    self.map_patches[i].append(
+                        Rectangle((j - 0.5, i - 0.5), 1, 1, facecolor=face_color, edgecolor='black', fill=True))
+                else:
+                    face_color = self.board_colors['free']
+                    self.map_patches[i].append(
+                        Rectangle((j - 0.5, i - 0.5), 1, 1, facecolor=face_color, edgecolor='black', fill=False))
+
+        # painting the starting positions of the players:
+        self.map_patches[players_positions[0][0]][players_positions[0][1]].fill = True
+        self.map_patches[players_positions[1][0]][players_positions[1][1]].fill = True
+
+        # create players:
+        self.T = 0
+        self.players = []
+        self.player_patches = []
+        for i in range(len(players_positions)):
+            self.players.append(Circle(tuple(reversed(players_positions[i])), 0.3, facecolor=self.players_colors[i],
+                                       edgecolor='black'))
+            self.players[i].original_face_color = self.players_colors[i]
+            self.player_patches.append(self.players[i])
+            self.T = max(self.T, len(players_positions[i]) - 1)
+
+        self.animation_func = animation_func
+        self.animation = None
+
+    def show(self):
+        self.animation = FuncAnimation(self.fig, self.animation_func,
+                                       init_func=self.init_func,
+                                       frames=int(self.T + 1) * 10,
+                                       interval=600,  # change game speed anumation here
+                                       blit=False)
+        plt.show()
+
+    def init_func(self):
+        for p in self.board_patch + sum(self.map_patches, []) + self.player_patches:
+            self.ax.add_patch(p)
+        return self.artists()
+
+    def artists(self):
+        return self.board_patch + sum(self.map_patches, []) + self.players
+
+    def add_fruit(self, pos, fruit_path):
+        """Draws the fruit image at pos (row, column) of the board, returns its artist.
+        """
+        img = plt.imread(fruit_path)
+        off_img = OffsetImage(img, zoom = 0.3)
+        bbox = AnnotationBbox(off_img, (pos[1], pos[0]), frameon=False)
+        return self.ax.add_artist(bbox)
+
+    def move_player(self, player_id, pos):
+        """Moves the player to pos (x, y) and paints its cell as stepped on.
+        """
+        self.players[player_id].center = pos
+        self.map_patches[pos[1]][pos[0]].fill = True
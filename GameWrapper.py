@@ -42,8 +42,9 @@ class GameWrapper:
 
         initial_board = self.set_initial_board(size, block_positions, starts)
 
+        # a terminal game is headless, no figure is built for it
         self.game = Game(initial_board, starts, max_fruit_score=max_fruit_score, max_fruit_time=max_fruit_time, 
-                        animated=True, animation_func=self.animate_func)
+                        animated=not terminal_viz, animation_func=self.animate_func)
 
         for i, player in enumerate(self.players):
             player.set_game_params(self.game.get_map_for_player_i(player_id=i))
@@ -0,0 +1,166 @@
+"""Opening books: the moves of the first plies of a board, searched deeply offline and stored next to its csv file.
+Build the book of a board from the project root with, e.g.:
+    python OpeningBook.py -board default_board.csv -plies 6 -move_time 10
+"""
+import argparse
+import glob
+import os
+import sys
+import numpy as np
+import utils
+
+
+BOARDS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'boards')
+
+
+def book_path(board_file_name):
+    """Returns the path of the book of a board csv file in the boards directory.
+    """
+    return os.path.join(BOARDS_DIR, os.path.splitext(board_file_name)[0] + '.book')
+
+
+class OpeningBook:
+    """The book move of every position of the player that the book reaches in its first plies, from both seats.
+    The fruits are placed at random in every game, so a position is hashed by its blocked cells and players only.
+    """
+    # the file is the header and the records sorted by key, the fingerprint is of the blocked cells of the board
+    HEADER = np.dtype([('fingerprint', '<u8'), ('height', '<u8'), ('width', '<u8')])
+    RECORD = np.dtype([('key', '<u8'), ('move', 'u1')])
+
+    def __init__(self, shape, fingerprint, entries):
+        """
+        input:
+            - shape: the shape of the board.
+            - fingerprint: the fingerprint of the start board of the book.
+            - entries: dict of {position key: direction index in utils.get_directions()}.
+        """
+        self.shape = tuple(shape)
+        self.fingerprint = fingerprint
+        self.zobrist = utils.Zobrist(self.shape)
+        self.records = np.array(sorted(entries.items()), dtype=self.RECORD)
+        self.hits = 0
+
+    def position_key(self, board):
+        return self.zobrist.full_hash(board, {}, {}, {})
+
+    def lookup(self, state):
+        """Returns the direction of the book move of the player in the state, or None if the position is not in
+        the book or a fruit is next to the player (the book does not know about the fruits).
+        """
+        direction = self.book_move(state, state.board, state.pos)
+        if direction is not None:
+            self.hits += 1
+        return direction
+
+    def rival_lookup(self, state):
+        """Returns the direction of the book move of the rival in the state (its expected reply), or None.
+        The book is of the positions of the player to move, so the rival is looked up with the seats swapped.
+        """
+        board = state.board.copy()
+        board[state.pos], board[state.rival_pos] = 2, 1
+        return self.book_move(state, board, state.rival_pos)
+
+    def book_move(self, state, board, pos):
+        if any(state.board[next_pos] > 2 for next_pos in state.succ(pos)):
+            return None
+        key = self.position_key(board)
+        index = np.searchsorted(self.records['key'], key)
+        if index == len(self.records) or self.records['key'][index] != key:
+            return None
+        direction = utils.get_directions()[self.records['move'][index]]
+        if utils.tup_add(pos, direction) not in state.succ(pos):
+            return None  # a collision of the hash
+        return direction
+
+    def save(self, path):
+        header = np.array([(self.fingerprint,) + self.shape], dtype=self.HEADER)
+        with open(path, 'wb') as f:
+            header.tofile(f)
+            self.records.tofile(f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            header = np.fromfile(f, dtype=cls.HEADER, count=1)[0]
+            records = np.fromfile(f, dtype=cls.RECORD)
+        book = cls((int(header['height']), int(header['width'])), int(header['fingerprint']), {})
+        book.records = records
+        return book
+
+    @classmethod
+    def find(cls, board, directory=BOARDS_DIR):
+        """Returns the book of the board in the directory, or None if it has no book.
+        input:
+            - board: np.array, the start board, as given in set_game_params.
+        """
+        fingerprint = utils.board_fingerprint(board)
+        for path in sorted(glob.glob(os.path.join(directory, '*.book'))):
+            with open(path, 'rb') as f:
+                header = np.fromfile(f, dtype=cls.HEADER, count=1)
+            if len(header) and (int(header[0]['fingerprint']), int(header[0]['height']),
+                                int(header[0]['width'])) == (fingerprint,) + board.shape:
+                return cls.load(path)
+        return None
+
+
+def build_book(board_file_name, plies, move_time, penalty_score=300):
+    """Searches the book moves of a board: in every position of the first plies of the game that the player
+    reaches by book moves, from both seats, the move of AlphabetaPlayer searching move_time seconds
+    on the board without fruits. All the moves of the rival are followed.
+    Returns the OpeningBook.
+    """
+    from GameWrapper import GameWrapper
+    from players.AlphabetaPlayer import Player
+    import time
+
+    size, blocks, starts = utils.get_board_from_csv(board_file_name)
+    board = GameWrapper.set_initial_board(size, blocks, starts)
+    book = OpeningBook(board.shape, utils.board_fingerprint(board), {})
+    entries = {}
+
+    def expand(player, ply, my_turn):
+        state = player.state
+        if ply == plies:
+            return
+        if my_turn:
+            state.start_time, state.time_limit = time.time(), move_time
+            score, direction = player.search_driver.search(state, max_depth=board.size)
+            if direction is None:
+                return
+            entries[book.position_key(state.board)] = utils.get_directions().index(direction)
+            next_poses = [utils.tup_add(state.pos, direction)]
+        else:
+            next_poses = state.succ(state.rival_pos)
+        for next_pos in next_poses:
+            state.apply(1 if my_turn else 2, next_pos)
+            expand(player, ply + 1, not my_turn)
+            state.undo()
+
+    for seat in [1, 2]:
+        player_board = board.copy()
+        if seat == 2:  # the board of the second player, as the game gives it: the player is 1 and the rival 2
+            player_board[board == 1], player_board[board == 2] = 2, 1
+        player = Player(move_time * plies, penalty_score)
+        player.set_game_params(player_board)
+        expand(player, 0, seat == 1)
+        print(f'seat {seat} done, {len(entries)} book positions', file=sys.stderr)
+
+    book.records = np.array(sorted(entries.items()), dtype=OpeningBook.RECORD)
+    return book
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-board', default='default_board.csv', type=str,
+                        help='Name of board file (.csv).')
+    parser.add_argument('-plies', default=6, type=int,
+                        help='Number of plies of the game (of both players) in the book.')
+    parser.add_argument('-move_time', default=10, type=float,
+                        help='Time (sec) to search each book move.')
+    parser.add_argument('-penalty_score', default=300, type=float,
+                        help='Penalty points for a player when it cant move.')
+    args = parser.parse_args()
+
+    opening_book = build_book(args.board, args.plies, args.move_time, args.penalty_score)
+    opening_book.save(book_path(args.board))
+    print(f'{len(opening_book.records)} positions written to {book_path(args.board)}')
@@ -0,0 +1,109 @@
+"""Batched playouts: many independent games played on to the end at once with NumPy, for MCTS.
+"""
+import numpy as np
+
+
+class BatchPlayouts:
+    """Plays N playouts of the same position at once, one ply of all of them per step, by the rules of the game
+    (see Game and GameWrapper), on (N, (H + 2) * (W + 2)) arrays of the boards with a border of blocked cells.
+    The moves are 'random' or 'greedy' (the move of SimplePlayer, ties broken at random).
+    """
+
+    def __init__(self, board_shape, penalty_score, policy='random', seed=None):
+        """
+        input:
+            - board_shape: the shape of the board of the game.
+            - penalty_score: the penalty of a player that can not move.
+            - policy: 'random' or 'greedy'.
+            - seed: seed of the random moves, None for a random seed.
+        """
+        assert policy in ['random', 'greedy']
+        self.height, self.width = board_shape
+        self.padded_width = self.width + 2
+        # in the order of utils.get_directions(): (1, 0), (0, 1), (-1, 0), (0, -1)
+        self.offsets = np.array([self.padded_width, 1, -self.padded_width, -1])
+        self.fruits_moves = 2 * min(board_shape)  # the moves of the game after which the fruits are removed
+        self.penalty_score = penalty_score
+        self.policy = policy
+        self.rand = np.random.RandomState(seed)
+
+    def index(self, pos):
+        return (pos[0] + 1) * self.padded_width + pos[1] + 1
+
+    def play(self, state, maximizing_player, first_player, n):
+        """Plays n playouts from the state.
+        input:
+            - state: the GameState to play from, it is not changed.
+            - maximizing_player: whether player 1 (the player of the state) is to move.
+            - first_player: the player (1 or 2 of the state) that moved first in the game.
+            - n: the number of playouts.
+        output:
+            - (the results for player 1: 1 for a win, 0.5 for a tie and 0 for a loss,
+               the final scores of player 1 minus the final scores of player 2), arrays of n floats.
+        """
+        board = np.pad(state.board, 1, mode='constant', constant_values=-1).ravel()
+        free = np.tile((board != -1) & (board != 1) & (board != 2), (n, 1))
+        fruits = np.tile(np.where(board > 2, board, 0), (n, 1))
+        positions = {1: np.full(n, self.index(state.pos)), 2: np.full(n, self.index(state.rival_pos))}
+        scores = {1: np.full(n, float(state.fruits_score)), 2: np.full(n, float(state.rival_fruits_score))}
+        moves = state.undo_depth
+        self.run(free, fruits, positions, scores, 1 if maximizing_player else 2, first_player, moves)
+        diffs = scores[1] - scores[2]
+        return np.where(diffs > 0, 1.0, np.where(diffs < 0, 0.0, 0.5)), diffs
+
+    def root_children(self, state, first_player, n):
+        """Plays n playouts after each move of player 1 (to move) in the state.
+        output:
+            - dict of {next_pos: (win rate, tie rate, loss rate, the final score differences as in play)}.
+        """
+        distributions = {}
+        for next_pos in state.succ(state.pos):
+            state.apply(1, next_pos)
+            try:
+                results, diffs = self.play(state, False, first_player, n)
+            finally:
+                state.undo()
+            distributions[next_pos] = (np.mean(results == 1), np.mean(results == 0.5), np.mean(results == 0), diffs)
+        return distributions
+
+    def run(self, free, fruits, positions, scores, player_index, first_player, moves):
+        """Plays all the playouts to the end, updating the arrays in place.
+        moves is the number of moves played in the game so far.
+        """
+        n = free.shape[0]
+        rows = np.arange(n)[:, None]
+        active = np.ones(n, dtype=bool)
+        last_turn = np.zeros(n, dtype=bool)  # the first player could not move, the second plays its last turn
+        while active.any():
+            pos = positions[player_index]
+            neighbors = pos[:, None] + self.offsets
+            legal = free[rows, neighbors]
+            stuck = active & ~legal.any(axis=1)
+            scores[player_index][stuck] -= self.penalty_score
+            moving = active & ~stuck
+
+            if self.policy == 'greedy':
+                # the free neighbors of each neighbor cell, after the player left pos
+                # (the border cells are never legal, their neighbors are clipped into the array)
+                second_neighbors = np.clip(neighbors[:, :, None] + self.offsets, 0, free.shape[1] - 1)
+                exits = free[rows[:, :, None], second_neighbors].sum(axis=2)
+                priority = np.where(exits == 0, -1, 4 - exits) + self.rand.random_sample(legal.shape) * 0.5
+            else:
+                priority = self.rand.random_sample(legal.shape)
+            choice = np.where(legal, priority, -2).argmax(axis=1)
+            next_pos = neighbors[rows[:, 0], choice]
+
+            movers = np.flatnonzero(moving)
+            next_pos = next_pos[movers]
+            free[movers, next_pos] = False
+            pos[movers] = next_pos
+            if moves < self.fruits_moves:
+                scores[player_index][movers] += fruits[movers, next_pos]
+                fruits[movers, next_pos] = 0
+            moves += 1
+
+            if player_index == first_player:
+                last_turn |= stuck
+            else:
+                active &= ~(stuck | last_turn)
+            player_index = 3 - player_index
@@ -0,0 +1,139 @@
+"""Connectivity index of the free cells of the board, for reachability queries during search.
+"""
+import numpy as np
+
+
+class RegionIndex:
+    """Labels the components (regions) of the free cells of the board of a hashed GameState, cached by the Zobrist
+    hash of the state and updated from the state before the last move when it is in the cache.
+    """
+
+    def __init__(self, state, max_mb=64):
+        """
+        input:
+            - state: a GameState with hashed=True, the regions are of its current board.
+            - max_mb: rough memory cap of the cache in MB, it is cleared when it gets larger.
+        """
+        assert state.zobrist is not None
+        self.state = state
+        self.max_entries = max(1, int(max_mb * 2 ** 20) // (state.board.size * 4 + 200))
+        self.cache = {}  # state key -> (labels, sizes)
+        self.next_label = 0
+        self.hits = 0
+        self.misses = 0
+
+    def union_find_labels(self, cells, labels):
+        """Writes into labels a new label for each component of the given free cells (all the free cells
+        of their components), by union-find on the pairs of neighbor cells.
+        Returns a dict of {label: number of cells}.
+        """
+        parent = {cell: cell for cell in cells}
+        size = {cell: 1 for cell in cells}
+
+        def find(cell):
+            while parent[cell] != cell:
+                parent[cell] = parent[parent[cell]]  # path halving
+                cell = parent[cell]
+            return cell
+
+        for cell in cells:
+            for neighbor in ((cell[0] + 1, cell[1]), (cell[0], cell[1] + 1)):
+                if neighbor in parent:
+                    root, neighbor_root = find(cell), find(neighbor)
+                    if root != neighbor_root:
+                        if size[root] < size[neighbor_root]:
+                            root, neighbor_root = neighbor_root, root
+                        parent[neighbor_root] = root
+                        size[root] += size[neighbor_root]
+
+        sizes, root_labels = {}, {}
+        for cell in cells:
+            root = find(cell)
+            if root not in root_labels:
+                root_labels[root] = self.next_label
+                sizes[self.next_label] = size[root]
+                self.next_label += 1
+            labels[cell] = root_labels[root]
+        return sizes
+
+    def locally_connected(self, pos):
+        """Returns whether the free neighbors of pos are connected through the 8 cells around it,
+        so taking pos out of its region does not split it.
+        """
+        board = self.state.board
+        height, width = board.shape
+        i, j = pos
+        ring = [(i - 1, j), (i - 1, j + 1), (i, j + 1), (i + 1, j + 1), (i + 1, j), (i + 1, j - 1), (i, j - 1),
+                (i - 1, j - 1)]  # clockwise from the top, the even ones are the neighbors
+        free = [0 <= r < height and 0 <= c < width and board[r, c] not in (-1, 1, 2) for r, c in ring]
+        # count the runs of free cells around pos that hold a neighbor
+        runs, neighbor_in_run = 0, False
+        start = free.index(False) if False in free else 0
+        for k in range(start + 1, start + 9):
+            k %= 8
+            if free[k]:
+                neighbor_in_run = neighbor_in_run or k % 2 == 0
+            elif neighbor_in_run:
+                runs, neighbor_in_run = runs + 1, False
+        return runs + neighbor_in_run <= 1
+
+    def regions(self):
+        """Returns (labels, sizes) of the current board: labels is an array of the region of every free cell
+        (the labels of the other cells are not meaningful, see neighbor_regions), sizes a dict of {label: number of
+        cells}. The labels array can be shared between states, it must not be changed.
+        """
+        state = self.state
+        entry = self.cache.get(state.key)
+        if entry is not None:
+            self.hits += 1
+            return entry
+        self.misses += 1
+
+        parent_entry = None
+        if state.undo_depth > 0:
+            move = state.undo_stack[state.undo_depth - 1]
+            parent_entry = self.cache.get(state.key ^ state.key_delta(*move))
+
+        if parent_entry is not None:
+            # the last move took the cell it stepped on out of its region, only that region may split
+            parent_labels, parent_sizes = parent_entry
+            next_pos = move[2]
+            label = parent_labels[next_pos]
+            sizes = dict(parent_sizes)
+            if self.locally_connected(next_pos):
+                labels = parent_labels
+                sizes[label] -= 1
+            else:
+                board = state.board
+                labels = parent_labels.copy()
+                labels[(board == -1) | (board == 1) | (board == 2)] = -1
+                cells = [(int(i), int(j)) for i, j in zip(*np.where(labels == label))]
+                del sizes[label]
+                sizes.update(self.union_find_labels(cells, labels))
+        else:
+            board = state.board
+            labels = np.full(board.shape, -1, dtype=np.int32)
+            cells = [(int(i), int(j)) for i, j in zip(*np.where((board != -1) & (board != 1) & (board != 2)))]
+            sizes = self.union_find_labels(cells, labels)
+
+        if len(self.cache) >= self.max_entries:
+            self.cache = {}
+        self.cache[state.key] = (labels, sizes)
+        return labels, sizes
+
+    def neighbor_regions(self, pos, labels):
+        board = self.state.board
+        return {labels[neighbor] for neighbor in self.state.neighbors[pos]
+                if board[neighbor] not in (-1, 1, 2) and labels[neighbor] >= 0}
+
+    def area(self, pos):
+        """Returns the number of free cells that can be reached from pos (not included).
+        """
+        labels, sizes = self.regions()
+        return sum(sizes[label] for label in self.neighbor_regions(pos, labels))
+
+    def same_region(self):
+        """Returns whether the players can reach a common free cell.
+        """
+        labels, _ = self.regions()
+        return bool(self.neighbor_regions(self.state.pos, labels) & self.neighbor_regions(self.state.rival_pos, labels))
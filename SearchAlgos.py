@@ -1,11 +1,39 @@
-"""Search Algos: MiniMax, AlphaBeta
+"""Search Algos: MiniMax, AlphaBeta, PVS, ParallelRootSearch, IterativeDeepening, LazySMP, MCTS
 """
 from utils import ALPHA_VALUE_INIT, BETA_VALUE_INIT
+import math
+import multiprocessing
+import numpy as np
 import operator
+import pickle
+import random
 import time
+import weakref
+
+
+class SearchTimeout(Exception):
+    """Raised in a search when its deadline is reached (or it is stopped), it aborts the whole search.
+    """
+    pass
+
+
+class ExactScore(float):
+    """A utility value of a position whose result is known exactly (e.g. a tie in the tablebase):
+    the search does not go on from it, as from a won (inf) or lost (-inf) position.
+    """
+    pass
+
+
+def game_over(score):
+    """Returns whether a utility value ends the line of the search: a win, a loss or an ExactScore.
+    """
+    return score in (float('inf'), float('-inf')) or isinstance(score, ExactScore)
 
 
 class SearchAlgos:
+    CHECK_EVERY = 16  # nodes between two reads of the clock
+    BUFFER = 50  # ms before the time limit of the state that the search is aborted at
+
     def __init__(self, utility, succ, perform_move, goal=None):
         """The constructor for all the search algos.
         You can code these functions as you like to, 
@@ -18,10 +46,36 @@ class SearchAlgos:
         self.utility = utility
         self.succ = succ
         self.perform_move = perform_move
+        self.time_is_up = False
+        self.nodes = 0
+        self.stop = None  # a shared flag (multiprocessing.RawValue) set by another process to abort the search
+        self.deadline = None  # time.monotonic() of the deadline of the current search
+        self.polls = 0
 
     def search(self, state, depth, maximizing_player):
         pass
 
+    def new_search(self):
+        """Resets the flags and counters of the last search, so the object can be reused for another search.
+        """
+        self.time_is_up = False
+        self.nodes = 0
+        self.deadline = None
+
+    def check_deadline(self, state):
+        """Called at every node of the search. Every CHECK_EVERY calls it reads the clock, and aborts the search
+        with SearchTimeout when it is BUFFER ms before the time limit of the state, or when the search was stopped.
+        """
+        self.polls += 1
+        if self.deadline is None:
+            time_left = state.time_limit - (time.time() - state.start_time)
+            self.deadline = time.monotonic() + time_left - self.BUFFER / 1000
+        elif self.polls % self.CHECK_EVERY:
+            return
+        if time.monotonic() >= self.deadline or (self.stop is not None and self.stop.value):
+            self.time_is_up = True
+            raise SearchTimeout()
+
 
 class MiniMax(SearchAlgos):
 
@@ -34,46 +88,310 @@ class MiniMax(SearchAlgos):
         """
         pos = None
         if maximizing_player:
-            pos = state[0]
+            pos = state.pos
         else:
-            pos = state[1]
+            pos = state.rival_pos
 
-        buffer = 200
-        time_left = (state[3] - (time.time() - state[2])) * 1000
+        self.check_deadline(state)
 
-        if time_left < buffer or depth <= 0 or len(self.succ(pos)) == 0:
+        if depth <= 0 or len(self.succ(pos)) == 0:
             res = (0, None)
             return res
 
+        self.nodes += 1
         scores = []
         for next_pos in self.succ(pos):
             direction = None
 
             self.perform_move(pos, next_pos)
-
-            if maximizing_player:
-                state[0] = next_pos
-                score = self.utility(state)
-                direction = tuple(map(operator.sub, next_pos, pos))
-                scores.append((score + self.search(state, depth - 1, not maximizing_player)[0], direction))
-                state[0] = pos
-            else:
-                state[1] = next_pos
-                score = self.utility(state)
-                scores.append((score + self.search(state, depth - 1, not maximizing_player)[0], direction))
-                state[1] = pos
-
-            self.perform_move(next_pos, pos)
+            try:
+                if maximizing_player:
+                    score = self.utility(state)
+                    direction = tuple(map(operator.sub, next_pos, pos))
+                    scores.append((score + self.search(state, depth - 1, not maximizing_player)[0], direction))
+                else:
+                    score = self.utility(state)
+                    scores.append((score + self.search(state, depth - 1, not maximizing_player)[0], direction))
+            finally:  # also when the search is aborted
+                self.perform_move(next_pos, pos)
 
         assert len(scores) != 0
 
         return max(scores) if maximizing_player else min(scores)
 
 
+class TranspositionTable:
+    """A fixed size hash table of already searched positions, indexed by their Zobrist hash.
+    Each entry stores (key, depth, value, bound, move, generation), the entries of an older search are always replaced.
+    """
+    EXACT, LOWER_BOUND, UPPER_BOUND = 0, 1, 2
+    SOLVED_DEPTH = 0xffff  # the depth of an entry whose search reached the end of the game in all its lines
+    ENTRY_BYTES = 160  # rough size of one entry (tuple + key + value + move) in memory
+
+    def __init__(self, max_mb=16, replacement='depth'):
+        """
+        :param max_mb: memory cap of the table in MB. The number of slots is the largest power of 2 that fits in it.
+        :param replacement: the replacement policy when two positions fall in the same slot:
+                            'depth' - keep the entry that was searched deeper (ties go to the new entry).
+                            'always' - always keep the new entry.
+        """
+        assert replacement in ['depth', 'always']
+        slots = max(1, int(max_mb * 2 ** 20) // self.ENTRY_BYTES)
+        self.size = 1 << (slots.bit_length() - 1)
+        self.mask = self.size - 1
+        self.replacement = replacement
+        self.table = [None] * self.size
+        self.generation = 0
+        self.probes = 0
+        self.hits = 0
+
+    def new_generation(self):
+        """Called before every search (turn), the entries stored until now become stale.
+        """
+        self.generation += 1
+
+    def lookup(self, key):
+        self.probes += 1
+        entry = self.table[key & self.mask]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+        return None
+
+    def store(self, key, depth, value, bound, move):
+        index = key & self.mask
+        entry = self.table[index]
+        if (entry is None or entry[0] == key or self.replacement == 'always'
+                or entry[5] != self.generation or depth >= entry[1]):
+            self.table[index] = (key, depth, value, bound, move, self.generation)
+
+    def clear(self):
+        self.table = [None] * self.size
+        self.probes = 0
+        self.hits = 0
+
+
+class SharedTranspositionTable(TranspositionTable):
+    """A TranspositionTable in shared memory for all the processes of a search (it can be pickled to a pool process).
+    It has no locks: a slot of 3 64-bit words written by two processes at once does not match its key.
+    """
+    MAX_DEPTH = 0xffff
+    # a slot is check (key ^ data ^ value), data (depth, bound, move and generation) and value,
+    # and a last word after the slots holds the current generation, so all the processes age the table together
+    WORDS = 3
+    GENERATIONS = 0xff  # the generation of an entry is stored modulo 256
+
+    def __init__(self, max_mb=16, replacement='depth', name=None):
+        """
+        :param name: The name of the shared memory of an existing table to attach to, None to create a new one.
+        """
+        from multiprocessing import shared_memory  # Python 3.8+
+        TranspositionTable.__init__(self, max_mb=max_mb, replacement=replacement)
+        self.max_mb = max_mb
+        self.table = None
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=(self.size * self.WORDS + 1) * 8)
+        self.entries = np.ndarray((self.size, self.WORDS), dtype=np.uint64, buffer=self.shm.buf)
+        self.values = self.entries.view(np.float64)
+        self.generations = np.ndarray(1, dtype=np.uint64, buffer=self.shm.buf, offset=self.size * self.WORDS * 8)
+        if self.owner:
+            self.entries.fill(0)
+            self.generations.fill(0)
+            # the creating process frees the memory when the table is gone
+            self.finalizer = weakref.finalize(self, SharedTranspositionTable.release, self.shm, True)
+        else:
+            self.finalizer = weakref.finalize(self, SharedTranspositionTable.release, self.shm, False)
+
+    @staticmethod
+    def release(shm, unlink):
+        shm.close()
+        if unlink:
+            shm.unlink()
+
+    def __getstate__(self):
+        return self.max_mb, self.replacement, self.shm.name
+
+    def __setstate__(self, state):
+        max_mb, replacement, name = state
+        self.__init__(max_mb, replacement, name)
+
+    def new_generation(self):
+        self.generations[0] = (int(self.generations[0]) + 1) & self.GENERATIONS
+
+    def lookup(self, key):
+        self.probes += 1
+        index = key & self.mask
+        check, data, value_bits = self.entries[index].tolist()
+        if check ^ data ^ value_bits != key:
+            return None
+        self.hits += 1
+        move = None
+        if data >> 18 & 1:
+            move = (data >> 19 & 0xffff, data >> 35 & 0xffff)
+        return key, data & 0xffff, float(self.values[index, 2]), data >> 16 & 0x3, move, data >> 51 & self.GENERATIONS
+
+    def store(self, key, depth, value, bound, move):
+        index = key & self.mask
+        check, data, value_bits = self.entries[index].tolist()
+        generation = int(self.generations[0])
+        if (self.replacement == 'always' or check ^ data ^ value_bits == key or depth >= data & 0xffff
+                or check == 0 or data >> 51 & self.GENERATIONS != generation):
+            data = min(depth, self.MAX_DEPTH) | bound << 16 | generation << 51
+            if move is not None:
+                data |= 1 << 18 | int(move[0]) << 19 | int(move[1]) << 35
+            self.entries[index, 1] = data
+            self.values[index, 2] = value
+            self.entries[index, 0] = key ^ data ^ int(self.entries[index, 2])
+
+    def clear(self):
+        self.entries.fill(0)
+        self.probes = 0
+        self.hits = 0
+
+
+class MoveOrdering:
+    """Orders the moves of a node for the AlphaBeta search: the principal variation move first,
+    then the killer moves of the ply, then the rest by the history heuristic. It is kept for all the searches of a game.
+    """
+    KILLERS_PER_PLY = 2
+
+    def __init__(self):
+        self.pv = []  # the principal variation found by the last completed iteration, a move per ply
+        self.killers = {}  # ply -> the last moves that caused a cutoff in this ply
+        self.history = {}  # (maximizing_player, move) -> sum of depth^2 of the cutoffs caused by the move
+        self.root_depth = None  # the undo depth of the state at the root of the last search
+
+    def clear(self):
+        self.pv = []
+        self.killers = {}
+        self.history = {}
+        self.root_depth = None
+
+    def new_root(self, state):
+        """Called before every search of the game with its root state, a GameState.
+        The moves played since the root of the last search are read from the undo stack of the state:
+        the pv goes on from them if they were its first moves, the killers of a ply move up to the ply of the
+        new root by the number of moves and the history is halved, so the cutoffs of the new search weigh more.
+        If the state is not a position after the last root, the tables are cleared.
+        """
+        root_depth = state.undo_depth
+        if self.root_depth is None or root_depth < self.root_depth:
+            self.clear()
+        else:
+            played = [next_pos for _, _, next_pos, _ in state.undo_stack[self.root_depth:root_depth]]
+            plies = len(played)
+            self.pv = self.pv[plies:] if self.pv[:plies] == played else []
+            self.killers = {ply - plies: killers for ply, killers in self.killers.items() if ply >= plies}
+            self.history = {key: value // 2 for key, value in self.history.items() if value > 1}
+        self.root_depth = root_depth
+
+    def order(self, moves, ply, maximizing_player, on_pv, tt_move=None):
+        """Returns the moves sorted from the most to the least promising.
+        :param on_pv: whether the node is on the principal variation of the last iteration.
+        :param tt_move: the best move stored in the transposition table for this node.
+        """
+        killers = self.killers.get(ply, [])
+
+        def rank(move):
+            if on_pv and ply < len(self.pv) and move == self.pv[ply]:
+                return 0, 0
+            if move == tt_move:
+                return 1, 0
+            if move in killers:
+                return 2, killers.index(move)
+            return 3, -self.history.get((maximizing_player, move), 0)
+
+        return sorted(moves, key=rank)
+
+    def add_cutoff(self, move, ply, depth, maximizing_player):
+        killers = self.killers.setdefault(ply, [])
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[self.KILLERS_PER_PLY:]
+        key = (maximizing_player, move)
+        self.history[key] = self.history.get(key, 0) + depth * depth
+
+
 class AlphaBeta(SearchAlgos):
+    """AlphaBeta with late move reductions and futility pruning, both off by default
+    (they trade some accuracy for depth).
+    """
+    LMR_FULL_MOVES = 1
+    LMR_MIN_DEPTH = 3
+
+    def __init__(self, utility, succ, perform_move, goal=None, hash_key=None, tt=None, move_ordering=None,
+                 lmr=False, futility_margin=None):
+        """
+        :param hash_key: function of (maximizing_player) that returns the Zobrist hash of the current state.
+        :param tt: TranspositionTable shared between searches, or None to search without it.
+        :param move_ordering: MoveOrdering shared between the iterations of a turn,
+                              or None to search the moves in the order of succ (best move from the tt first).
+        :param lmr: whether to use late move reductions.
+        :param futility_margin: function of (state, next_pos) that returns how much the utility can change
+                                by the move to next_pos, or None to search without futility pruning.
+        """
+        SearchAlgos.__init__(self, utility, succ, perform_move, goal)
+        self.hash_key = hash_key
+        self.tt = tt if hash_key is not None else None
+        self.move_ordering = move_ordering
+        self.lmr = lmr
+        self.futility_margin = futility_margin
+        self.ply = 0
+        self.follow_pv = False  # whether the searched node is on the principal variation of the last iteration
+        self.pv_table = {}  # ply -> the principal variation found from the node in this ply
+        self.node_utility = None  # the utility of the move to the searched node, None at the root
+        # cutoff statistics
+        self.moves_searched = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        # selective search statistics
+        self.reductions = 0
+        self.re_searches = 0
+        self.futility_prunes = 0
+        self.horizon_nodes = 0  # nodes cut by the depth and not by the end of the game, 0 if the search solved the root
+
+    def new_search(self):
+        SearchAlgos.new_search(self)
+        self.ply = 0
+        self.follow_pv = False
+        self.pv_table = {}
+        self.node_utility = None
+        self.moves_searched = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.reductions = 0
+        self.re_searches = 0
+        self.futility_prunes = 0
+        self.horizon_nodes = 0
+
+    def cutoff_stats(self):
+        """Returns a dict of the statistics of the last search:
+        nodes - number of searched (non leaf) nodes.
+        cutoffs - number of nodes that were cut off.
+        first_move_cutoff_rate - part of the cutoffs that happened on the first searched move.
+        branching_factor - average number of moves searched in a node.
+        reductions, re_searches - number of reduced moves and of them the ones searched again to the full depth.
+        futility_prunes - number of moves that were not searched by futility pruning.
+        """
+        return {'nodes': self.nodes,
+                'cutoffs': self.cutoffs,
+                'first_move_cutoff_rate': self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0,
+                'branching_factor': self.moves_searched / self.nodes if self.nodes else 0,
+                'reductions': self.reductions,
+                're_searches': self.re_searches,
+                'futility_prunes': self.futility_prunes}
+
+    def may_end_game(self, state, pos, next_pos, maximizing_player):
+        """Returns whether after the move from pos to next_pos one of the players may have no moves.
+        """
+        rival_pos = state.rival_pos if maximizing_player else state.pos
+        return (not any(cell != pos for cell in self.succ(next_pos))
+                or not any(cell != next_pos for cell in self.succ(rival_pos)))
 
     def search(self, state, depth, maximizing_player, alpha=ALPHA_VALUE_INIT, beta=BETA_VALUE_INIT):
         """Start the AlphaBeta algorithm.
+        The value of a node is the sum of the utilities along the best path from it, so the window
+        passed to a child is shifted by the utility of the move that leads to it.
         :param state: The state to start from.
         :param depth: The maximum allowed depth for the algorithm.
         :param maximizing_player: Whether this is a max node (True) or a min node (False).
@@ -83,51 +401,688 @@ class AlphaBeta(SearchAlgos):
         """
         pos = None
         if maximizing_player:
-            pos = state[0]
+            pos = state.pos
         else:
-            pos = state[1]
+            pos = state.rival_pos
 
-        buffer = 200
-        time_left = (state[3] - (time.time() - state[2])) * 1000
+        self.check_deadline(state)
+        node_utility, self.node_utility = self.node_utility, None
 
-        if time_left < buffer or depth <= 0 or len(self.succ(pos)) == 0:
+        ply = self.ply
+        self.pv_table[ply] = []
+        next_poses = self.succ(pos)
+        if depth <= 0 or len(next_poses) == 0:
+            if len(next_poses) > 0:
+                self.horizon_nodes += 1
             res = (0, None)
             return res
 
-        scores = []
-        for next_pos in self.succ(pos):
-            direction = None
+        self.nodes += 1
+        alpha_orig, beta_orig = alpha, beta
+        horizon_nodes = self.horizon_nodes
+        key, tt_move = None, None
+        if self.tt is not None:
+            key = self.hash_key(maximizing_player)
+            entry = self.tt.lookup(key)
+            if entry is not None:
+                _, entry_depth, value, bound, tt_move, _ = entry
+                if entry_depth >= depth:
+                    if bound == TranspositionTable.LOWER_BOUND:
+                        alpha = max(alpha, value)
+                    elif bound == TranspositionTable.UPPER_BOUND:
+                        beta = min(beta, value)
+                    if bound == TranspositionTable.EXACT or alpha >= beta:
+                        if entry_depth < TranspositionTable.SOLVED_DEPTH:
+                            self.horizon_nodes += 1
+                        self.pv_table[ply] = [tt_move]
+                        direction = tuple(map(operator.sub, tt_move, pos)) if maximizing_player else None
+                        return value, direction
+
+        on_pv = ply == 0 or self.follow_pv
+        if self.move_ordering is not None:
+            next_poses = self.move_ordering.order(next_poses, ply, maximizing_player, on_pv, tt_move)
+        elif tt_move in next_poses:  # search the best move of the last search first
+            next_poses.remove(tt_move)
+            next_poses.insert(0, tt_move)
+
+        futile = self.futility_margin is not None and depth == 1 and node_utility is not None and not on_pv
+        best_score, best_move = None, None
+        for i, next_pos in enumerate(next_poses):
+            if futile and not self.may_end_game(state, pos, next_pos, maximizing_player):
+                # in the last ply the value of a move is its utility, which is near the utility of the node
+                margin = self.futility_margin(state, next_pos)
+                score = node_utility + margin if maximizing_player else node_utility - margin
+                if (maximizing_player and score <= alpha) or (not maximizing_player and score >= beta):
+                    self.futility_prunes += 1
+                    self.horizon_nodes += 1
+                    if (best_score is None or (maximizing_player and score > best_score)
+                            or (not maximizing_player and score < best_score)):
+                        best_score, best_move = score, next_pos
+                    continue
+
+            self.moves_searched += 1
             self.perform_move(pos, next_pos)
+            try:
+                score = self.utility(state)
+                if not game_over(score):
+                    pv = self.move_ordering.pv if self.move_ordering is not None else []
+                    self.follow_pv = on_pv and ply < len(pv) and next_pos == pv[ply]
+                    self.ply += 1
+                    child_depth = depth - 1
+                    # late move reduction: a late move out of the PV is searched one ply shallower first,
+                    # and again to the full depth only if it may improve the bound of the player to move
+                    if self.lmr and not on_pv and i >= self.LMR_FULL_MOVES and depth >= self.LMR_MIN_DEPTH:
+                        self.reductions += 1
+                        self.node_utility = score
+                        reduced_score = score + self.search(state, depth - 2, not maximizing_player,
+                                                            alpha - score, beta - score)[0]
+                        if (maximizing_player and reduced_score <= alpha) or \
+                                (not maximizing_player and reduced_score >= beta):
+                            child_depth = None  # failed low, the move is not better than the ones searched
+                        else:
+                            self.re_searches += 1
+                    if child_depth is not None:
+                        self.node_utility = score
+                        score += self.search(state, child_depth, not maximizing_player, alpha - score, beta - score)[0]
+                    else:
+                        score = reduced_score
+                    self.ply -= 1
+                else:
+                    self.pv_table[ply + 1] = []
+            finally:  # also when the search is aborted
+                self.perform_move(next_pos, pos)
 
+            if (best_score is None or (maximizing_player and score > best_score)
+                    or (not maximizing_player and score < best_score)):
+                best_score, best_move = score, next_pos
+                self.pv_table[ply] = [next_pos] + self.pv_table.get(ply + 1, [])
             if maximizing_player:
-                state[0] = next_pos
-                direction = tuple(map(operator.sub, next_pos, pos))
-                score = self.utility(state)
-                scores.append((score + self.search(state, depth - 1, not maximizing_player)[0], direction))
-                curr_max = max(scores)[0]
-                alpha = max(curr_max, alpha)
-                if curr_max >= beta:
-                    res = (float('inf'), direction)
-                    state[0] = pos
-                    self.perform_move(next_pos, pos)
-                    return res
-                state[0] = pos
+                alpha = max(alpha, score)
+            else:
+                beta = min(beta, score)
+            if alpha >= beta:
+                self.cutoffs += 1
+                if i == 0:
+                    self.first_move_cutoffs += 1
+                if self.move_ordering is not None:
+                    self.move_ordering.add_cutoff(next_pos, ply, depth, maximizing_player)
+                break
 
+        if self.tt is not None:
+            if best_score <= alpha_orig:
+                bound = TranspositionTable.UPPER_BOUND
+            elif best_score >= beta_orig:
+                bound = TranspositionTable.LOWER_BOUND
             else:
-                state[1] = next_pos
-                score = self.utility(state)
-                scores.append((score + self.search(state, depth - 1, not maximizing_player)[0], direction))
-                curr_min = min(scores)[0]
-                beta = min(curr_min, beta)
-                if curr_min <= alpha:
-                    res = (float('-inf'), direction)
-                    state[1] = pos
-                    self.perform_move(next_pos, pos)
-                    return res
-                state[1] = pos
-
-            self.perform_move(next_pos, pos)
+                bound = TranspositionTable.EXACT
+            if self.horizon_nodes == horizon_nodes:  # the value is the same at any depth
+                depth = TranspositionTable.SOLVED_DEPTH
+            self.tt.store(key, depth, best_score, bound, best_move)
 
-        assert len(scores) != 0
+        if ply == 0 and self.move_ordering is not None:
+            self.move_ordering.pv = self.pv_table[0]
 
-        return max(scores) if maximizing_player else min(scores)
+        direction = tuple(map(operator.sub, best_move, pos)) if maximizing_player else None
+        return best_score, direction
+
+
+class PVS(AlphaBeta):
+    """Principal Variation Search (NegaScout) in a negamax formulation.
+    The first move of a node is searched with the full window, the rest with a null window
+    around alpha, and only a move that falls inside the window is searched again with the full window.
+    """
+    NULL_WINDOW = 1e-6
+
+    def search(self, state, depth, maximizing_player, alpha=ALPHA_VALUE_INIT, beta=BETA_VALUE_INIT):
+        """Start the PVS algorithm.
+        :param state: The state to start from.
+        :param depth: The maximum allowed depth for the algorithm.
+        :param maximizing_player: Whether this is a max node (True) or a min node (False).
+        :param alpha: alpha value
+        :param: beta: beta value
+        :return: A tuple: (The min max algorithm value, The direction in case of max node or None in min mode)
+        """
+        pos = state.pos if maximizing_player else state.rival_pos
+        if maximizing_player:
+            score, best_move = self.negamax(state, depth, alpha, beta, 1)
+        else:
+            score, best_move = self.negamax(state, depth, -beta, -alpha, -1)
+            score = -score
+        direction = None
+        if maximizing_player and best_move is not None:
+            direction = tuple(map(operator.sub, best_move, pos))
+        return score, direction
+
+    def negamax(self, state, depth, alpha, beta, color):
+        """The value of a node for the player to move: color is 1 for the max player and -1 for the min player.
+        :return: A tuple: (The negamax value, The best next position)
+        """
+        maximizing_player = color > 0
+        pos = None
+        if maximizing_player:
+            pos = state.pos
+        else:
+            pos = state.rival_pos
+
+        self.check_deadline(state)
+
+        ply = self.ply
+        self.pv_table[ply] = []
+        next_poses = self.succ(pos)
+        if depth <= 0 or len(next_poses) == 0:
+            if len(next_poses) > 0:
+                self.horizon_nodes += 1
+            return 0, None
+
+        self.nodes += 1
+        alpha_orig = alpha
+        horizon_nodes = self.horizon_nodes
+        key, tt_move = None, None
+        if self.tt is not None:
+            key = self.hash_key(maximizing_player)
+            entry = self.tt.lookup(key)
+            if entry is not None:
+                _, entry_depth, value, bound, tt_move, _ = entry
+                if entry_depth >= depth:
+                    if bound == TranspositionTable.LOWER_BOUND:
+                        alpha = max(alpha, value)
+                    elif bound == TranspositionTable.UPPER_BOUND:
+                        beta = min(beta, value)
+                    if bound == TranspositionTable.EXACT or alpha >= beta:
+                        if entry_depth < TranspositionTable.SOLVED_DEPTH:
+                            self.horizon_nodes += 1
+                        self.pv_table[ply] = [tt_move]
+                        return value, tt_move
+
+        on_pv = ply == 0 or self.follow_pv
+        if self.move_ordering is not None:
+            next_poses = self.move_ordering.order(next_poses, ply, maximizing_player, on_pv, tt_move)
+        elif tt_move in next_poses:
+            next_poses.remove(tt_move)
+            next_poses.insert(0, tt_move)
+
+        best_score, best_move = None, None
+        for i, next_pos in enumerate(next_poses):
+            self.moves_searched += 1
+            self.perform_move(pos, next_pos)
+            try:
+                value = self.utility(state)
+                score = color * value
+                if not game_over(value):
+                    pv = self.move_ordering.pv if self.move_ordering is not None else []
+                    self.follow_pv = on_pv and ply < len(pv) and next_pos == pv[ply]
+                    self.ply += 1
+                    if i == 0:
+                        score -= self.negamax(state, depth - 1, score - beta, score - alpha, -color)[0]
+                    else:
+                        null_score = score - self.negamax(state, depth - 1, score - alpha - self.NULL_WINDOW,
+                                                          score - alpha, -color)[0]
+                        if alpha < null_score < beta:  # the null window failed high, search again to get the value
+                            null_score = score - self.negamax(state, depth - 1, score - beta, score - alpha,
+                                                              -color)[0]
+                        score = null_score
+                    self.ply -= 1
+                else:
+                    self.pv_table[ply + 1] = []
+            finally:  # also when the search is aborted
+                self.perform_move(next_pos, pos)
+
+            if best_score is None or score > best_score:
+                best_score, best_move = score, next_pos
+                self.pv_table[ply] = [next_pos] + self.pv_table.get(ply + 1, [])
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                self.cutoffs += 1
+                if i == 0:
+                    self.first_move_cutoffs += 1
+                if self.move_ordering is not None:
+                    self.move_ordering.add_cutoff(next_pos, ply, depth, maximizing_player)
+                break
+
+        if self.tt is not None:
+            if best_score <= alpha_orig:
+                bound = TranspositionTable.UPPER_BOUND
+            elif best_score >= beta:
+                bound = TranspositionTable.LOWER_BOUND
+            else:
+                bound = TranspositionTable.EXACT
+            if self.horizon_nodes == horizon_nodes:  # the value is the same at any depth
+                depth = TranspositionTable.SOLVED_DEPTH
+            self.tt.store(key, depth, best_score, bound, best_move)
+
+        if ply == 0 and self.move_ordering is not None:
+            self.move_ordering.pv = self.pv_table[0]
+
+        return best_score, best_move
+
+
+# the state and the search algo of a ParallelRootSearch worker process, set by init_search_worker
+worker_state = None
+worker_search_algo = None
+worker_root = None  # (key, undo depth) of the root of the last searched root move
+
+
+def init_search_worker(make_search_algo, state, stop=None):
+    """The initializer of the ParallelRootSearch, LazySMP and pondering pool processes.
+    :param make_search_algo: function of (state) that returns the search algo to search the state with.
+                             It must be picklable (a module level function or a functools.partial of one).
+    :param state: a copy of the GameState of the game, kept by the worker and loaded with the searched position.
+    :param stop: multiprocessing.RawValue shared by all the workers, the searches of the workers abort while it is set.
+    """
+    global worker_state, worker_search_algo
+    worker_state = state
+    worker_search_algo = make_search_algo(state)
+    worker_search_algo.stop = stop
+
+
+def search_root_move(args):
+    """Searches a single root move in a worker process.
+    :param args: A tuple: (The state to search from, The root move, The depth of the root, alpha, beta)
+    :return: A tuple: (The value of the move, The number of searched nodes, Whether the search was aborted,
+                       The principal variation after the move)
+    """
+    global worker_root
+    state, next_pos, depth, alpha, beta = args
+    worker_state.load(state)
+    algo = worker_search_algo
+    if (state.key, state.undo_depth) != worker_root:  # a new turn, as IterativeDeepening.search starts it
+        worker_root = (state.key, state.undo_depth)
+        if algo.tt is not None and not isinstance(algo.tt, SharedTranspositionTable):  # the shared one ages as one
+            algo.tt.new_generation()
+        if algo.move_ordering is not None:
+            algo.move_ordering.new_root(worker_state)
+    algo.new_search()
+    try:
+        score = ParallelRootSearch.search_move(algo, worker_state, next_pos, depth, alpha, beta)
+    except SearchTimeout:
+        score = 0
+    return score, algo.nodes, algo.time_is_up, algo.pv_table.get(1, [])
+
+
+class ParallelRootSearch(SearchAlgos):
+    """Root parallel search over a pool of worker processes: the first root move is searched in this process
+    for a bound and the rest in parallel, one pool task per move, merged in the order of the root moves.
+    It has the interface of AlphaBeta, so IterativeDeepening can drive it.
+    """
+
+    def __init__(self, search_algo, pool):
+        """
+        :param search_algo: The AlphaBeta (or PVS) object of this process, searches the first root move.
+        :param pool: multiprocessing.Pool with init_search_worker as initializer, created once for the game.
+                     None to search on this process only.
+        """
+        SearchAlgos.__init__(self, search_algo.utility, search_algo.succ, search_algo.perform_move)
+        self.search_algo = search_algo
+        self.move_ordering = search_algo.move_ordering
+        self.tt = search_algo.tt
+        self.pool = pool
+        self.best_move = None  # the best root move of the last completed search, searched first
+
+    def new_search(self):
+        SearchAlgos.new_search(self)
+        self.search_algo.new_search()
+
+    @staticmethod
+    def search_move(search_algo, state, next_pos, depth, alpha, beta):
+        """Returns the value of the root move to next_pos, searched to the given depth with the root window.
+        The child is searched one ply below the root, as the root loop of AlphaBeta searches it, so its killers
+        and principal variation are of its own ply. The principal variation after the move is left in
+        search_algo.pv_table[1].
+        """
+        pos = state.pos
+        pv = search_algo.move_ordering.pv if search_algo.move_ordering is not None else []
+        search_algo.perform_move(pos, next_pos)
+        try:
+            search_algo.pv_table[1] = []
+            score = search_algo.utility(state)
+            if not game_over(score):
+                search_algo.follow_pv = len(pv) > 0 and next_pos == pv[0]
+                search_algo.ply = 1
+                score += search_algo.search(state, depth - 1, False, alpha - score, beta - score)[0]
+        finally:  # also when the search is aborted
+            search_algo.ply = 0
+            search_algo.perform_move(next_pos, pos)
+        return score
+
+    def search(self, state, depth, maximizing_player, alpha=ALPHA_VALUE_INIT, beta=BETA_VALUE_INIT):
+        """Start the parallel search.
+        :param state: The state to start from.
+        :param depth: The maximum allowed depth for the algorithm.
+        :param maximizing_player: Whether this is a max node (True) or a min node (False).
+        :param alpha: alpha value
+        :param: beta: beta value
+        :return: A tuple: (The min max algorithm value, The direction in case of max node or None in min mode)
+        """
+        pos = state.pos
+        next_poses = self.succ(pos)
+        if self.pool is None or not maximizing_player or depth <= 1 or len(next_poses) <= 1:
+            try:
+                return self.search_algo.search(state, depth, maximizing_player, alpha, beta)
+            finally:
+                self.time_is_up, self.nodes = self.search_algo.time_is_up, self.search_algo.nodes
+
+        if self.best_move in next_poses:
+            next_poses.remove(self.best_move)
+            next_poses.insert(0, self.best_move)
+
+        # the eldest brother first, its value is the lower bound of the younger ones
+        try:
+            best_score = self.search_move(self.search_algo, state, next_poses[0], depth, alpha, beta)
+        finally:
+            self.time_is_up, self.nodes = self.search_algo.time_is_up, self.search_algo.nodes
+        best_move = next_poses[0]
+        best_pv = self.search_algo.pv_table.get(1, [])
+        alpha = max(alpha, best_score)
+
+        if alpha < beta:
+            tasks = [(state, next_pos, depth, alpha, beta) for next_pos in next_poses[1:]]
+            time_left = state.time_limit - (time.time() - state.start_time)
+            try:
+                results = self.pool.map_async(search_root_move, tasks).get(max(time_left, 0))
+            except multiprocessing.TimeoutError:
+                self.time_is_up = True
+                raise SearchTimeout()
+
+            for next_pos, (score, nodes, time_is_up, pv) in zip(next_poses[1:], results):
+                self.nodes += nodes
+                self.time_is_up = self.time_is_up or time_is_up
+                if score > best_score:
+                    best_score, best_move, best_pv = score, next_pos, pv
+            if self.time_is_up:
+                raise SearchTimeout()
+
+        self.best_move = best_move
+        if self.move_ordering is not None:  # the principal variation of the search, as the root of AlphaBeta sets it
+            self.move_ordering.pv = [best_move] + best_pv
+        return best_score, tuple(map(operator.sub, best_move, pos))
+
+
+class IterativeDeepening:
+    """Iterative deepening driver for the MiniMax and AlphaBeta algos, used for all the turns of a game,
+    so what the search algo keeps between searches (transposition table, move ordering) carries over.
+    """
+
+    def __init__(self, search_algo, aspiration_window=None, time_manager=None):
+        """
+        :param search_algo: The MiniMax or AlphaBeta object to search with.
+        :param aspiration_window: Half width of the AlphaBeta window around the score of the last iteration,
+                                  or None to always search with a full window.
+        :param time_manager: TimeManager that decides after every iteration whether to start the next one
+                             (within the time budget), or None to deepen until the time budget is used.
+        """
+        self.search_algo = search_algo
+        self.aspiration_window = aspiration_window
+        self.time_manager = time_manager
+        self.iterations = []  # (depth, score, direction, nodes, time) of the completed iterations of the last search
+        self.aspiration_fails = 0
+
+    def search(self, state, time_budget=None, max_depth=None):
+        """Searches deeper and deeper from the state until the time budget is used.
+        :param state: The state to start from, a GameState.
+                      The search algo aborts an iteration (with SearchTimeout) when its time_limit is about to end.
+        :param time_budget: Time (sec) from start_time after which no new iteration is started,
+                            time_limit if None.
+        :param max_depth: The maximum depth to search to, unbounded if None.
+        :return: A tuple: (The score, The direction) of the deepest completed iteration,
+                 (None, None) if no iteration was completed.
+        """
+        start_time, time_limit = state.start_time, state.time_limit
+        if time_budget is None:
+            time_budget = time_limit
+        buffer = SearchAlgos.BUFFER
+        self.iterations = []
+        if getattr(self.search_algo, 'tt', None) is not None:
+            self.search_algo.tt.new_generation()
+        if getattr(self.search_algo, 'move_ordering', None) is not None:
+            self.search_algo.move_ordering.new_root(state)
+
+        best_score, best_direction = None, None
+        depth = 1
+        time_left = (time_budget - (time.time() - start_time)) * 1000
+        while time_left > buffer and (max_depth is None or depth <= max_depth):
+            try:
+                score, direction = self.search_iteration(state, depth, best_score)
+            except SearchTimeout:  # keep the last completed iteration
+                break
+            best_score, best_direction = score, direction
+            self.iterations.append((depth, score, direction, self.search_algo.nodes, time.time() - start_time))
+            if score in [float('inf'), float('-inf')] or getattr(self.search_algo, 'horizon_nodes', None) == 0:
+                break  # solved: a deeper iteration finds the same result
+            if self.time_manager is not None and not self.time_manager.next_iteration(self.iterations):
+                break
+            depth += 1
+            time_left = (time_budget - (time.time() - start_time)) * 1000
+
+        return best_score, best_direction
+
+    def search_iteration(self, state, depth, prev_score):
+        self.search_algo.new_search()
+        if (self.aspiration_window is None or not isinstance(self.search_algo, AlphaBeta)
+                or prev_score is None or prev_score in [float('inf'), float('-inf')]):
+            return self.search_algo.search(state, depth, True)
+
+        # aspiration window: search a narrow window around the last score, widen it when the score falls outside
+        window = self.aspiration_window
+        alpha, beta = prev_score - window, prev_score + window
+        while True:
+            score, direction = self.search_algo.search(state, depth, True, alpha, beta)
+            if ALPHA_VALUE_INIT < alpha and score <= alpha:
+                window *= 2
+                alpha = prev_score - window if window <= 8 * self.aspiration_window else ALPHA_VALUE_INIT
+            elif beta < BETA_VALUE_INIT and score >= beta:
+                window *= 2
+                beta = prev_score + window if window <= 8 * self.aspiration_window else BETA_VALUE_INIT
+            else:
+                return score, direction
+            self.aspiration_fails += 1
+
+
+def helper_search(args):
+    """Searches the root deeper and deeper in a worker process, into the shared transposition table
+    (a lazy SMP helper, or pondering on the rival's time).
+    :param args: A tuple: (The pickled state to search from, The first depth to search,
+                           Time (sec) from start_time to stop at, The maximum depth to search to)
+    :return: The number of searched nodes.
+    """
+    state, depth, time_budget, max_depth = args
+    worker_state.load(pickle.loads(state))
+    worker_state.time_limit = time_budget
+    algo = worker_search_algo
+    if algo.move_ordering is not None:
+        algo.move_ordering.clear()
+
+    buffer = SearchAlgos.BUFFER
+    nodes = 0
+    time_left = (time_budget - (time.time() - worker_state.start_time)) * 1000
+    while time_left > buffer and (max_depth is None or depth <= max_depth):
+        algo.new_search()
+        try:
+            algo.search(worker_state, depth, True)
+        except SearchTimeout:
+            break
+        finally:
+            nodes += algo.nodes
+        depth += 1
+        time_left = (time_budget - (time.time() - worker_state.start_time)) * 1000
+    return nodes
+
+
+class LazySMP:
+    """Lazy SMP driver: helper processes search the root of the IterativeDeepening driver of this process
+    into the same SharedTranspositionTable, half of them a depth ahead, and the driver reads their entries.
+    """
+
+    def __init__(self, search_driver, pool, helpers, stop=None):
+        """
+        :param search_driver: The IterativeDeepening driver of this process, its search algo searches
+                              with the SharedTranspositionTable.
+        :param pool: multiprocessing.Pool with init_search_worker as initializer, created once for the game,
+                     whose search algos search with the same SharedTranspositionTable.
+        :param helpers: The number of helper searches to run in the pool.
+        :param stop: The stop flag of the pool (see init_search_worker), set to stop the helpers when the driver
+                     is done before the time budget (its time manager stopped deepening), or None to let them run
+                     until the time budget.
+        """
+        self.search_driver = search_driver
+        self.pool = pool
+        self.helpers = helpers
+        self.stop = stop
+        self.iterations = []
+        self.helper_nodes = 0
+
+    def search(self, state, time_budget=None, max_depth=None):
+        """Searches the state as IterativeDeepening.search does, with the helpers searching along.
+        """
+        if time_budget is None:
+            time_budget = state.time_limit
+        time_budget = min(time_budget, state.time_limit)
+        # pickled here, as the pool sends the tasks while this process already searches (and changes) the state
+        snapshot = pickle.dumps(state)
+        tasks = [(snapshot, 2 - i % 2, time_budget, max_depth) for i in range(self.helpers)]
+        helpers = self.pool.map_async(helper_search, tasks)
+
+        res = self.search_driver.search(state, time_budget, max_depth)
+        self.iterations = self.search_driver.iterations
+
+        if self.stop is not None:
+            self.stop.value = 1
+        time_left = state.time_limit - (time.time() - state.start_time)
+        try:
+            self.helper_nodes = sum(helpers.get(max(time_left, 0)))
+        except multiprocessing.TimeoutError:
+            self.helper_nodes = 0
+        finally:
+            if self.stop is not None:
+                self.stop.value = 0
+        return res
+
+
+class MCTSNode:
+    """A node of the MCTS tree.
+    """
+    __slots__ = ['move', 'maximizing_player', 'children', 'untried', 'visits', 'total']
+
+    def __init__(self, move, maximizing_player):
+        self.move = move  # the position moved to from the parent node, None at the root
+        self.maximizing_player = maximizing_player  # whether player 1 is to move in the node
+        self.children = []
+        self.untried = None  # the moves that are not expanded yet, set when the node is first selected
+        self.visits = 0
+        self.total = 0.0  # the sum of the playout results for the player that moved to the node
+
+
+class MCTS(SearchAlgos):
+    """Monte Carlo Tree Search with UCT selection, until the deadline of the state: the move is the most visited
+    child of the root. The tree is kept between the searches of a game, advance() moves its root along the moves.
+    """
+    CHECK_EVERY = 1
+    EXPLORATION = 2 ** 0.5
+
+    def __init__(self, utility, succ, perform_move, goal=None, playout=None, exploration=EXPLORATION):
+        """
+        :param utility: function of (state, maximizing_player), called when the player to move has no moves,
+                        that returns the result of the game for player 1: 1 for a win, 0.5 for a tie and 0 for a loss.
+        :param playout: function of (state, maximizing_player) that plays the game on from the state
+                        and returns its result for player 1, or None for uniformly random playouts.
+        :param exploration: The exploration constant of UCB1.
+        """
+        SearchAlgos.__init__(self, utility, succ, perform_move, goal)
+        self.playout = playout if playout is not None else self.random_playout
+        self.exploration = exploration
+        self.root = None
+
+    def advance(self, next_pos):
+        """Moves the root to its child of the played move to next_pos, or drops the tree if it was not expanded.
+        """
+        if self.root is not None:
+            self.root = next((child for child in self.root.children if child.move == next_pos), None)
+
+    def random_playout(self, state, maximizing_player):
+        moves = []
+        try:
+            while True:
+                pos = state.pos if maximizing_player else state.rival_pos
+                next_poses = self.succ(pos)
+                if not next_poses:
+                    return self.utility(state, maximizing_player)
+                next_pos = random.choice(next_poses)
+                self.perform_move(pos, next_pos)
+                moves.append((pos, next_pos))
+                maximizing_player = not maximizing_player
+        finally:
+            for pos, next_pos in reversed(moves):
+                self.perform_move(next_pos, pos)
+
+    def select_child(self, node):
+        log_visits = math.log(node.visits)
+        return max(node.children, key=lambda child: (child.total / child.visits
+                                                     + self.exploration * math.sqrt(log_visits / child.visits)))
+
+    def iterate(self, state, root):
+        """Runs one iteration from the root: selection, expansion, playout and backpropagation.
+        """
+        node, path, moves = root, [root], []
+        try:
+            while True:
+                pos = state.pos if node.maximizing_player else state.rival_pos
+                if node.untried is None:
+                    node.untried = self.succ(pos)
+                    random.shuffle(node.untried)
+                if node.untried or not node.children:
+                    break
+                node = self.select_child(node)
+                self.perform_move(pos, node.move)
+                moves.append((pos, node.move))
+                path.append(node)
+
+            if node.untried:
+                child = MCTSNode(node.untried.pop(), not node.maximizing_player)
+                node.children.append(child)
+                self.perform_move(pos, child.move)
+                moves.append((pos, child.move))
+                path.append(child)
+                result = self.playout(state, child.maximizing_player)
+            else:  # the player to move has no moves, the game is over
+                result = self.utility(state, node.maximizing_player)
+        finally:  # also when the search is aborted
+            for pos, next_pos in reversed(moves):
+                self.perform_move(next_pos, pos)
+
+        self.nodes += 1
+        for node in path:
+            node.visits += 1
+            node.total += 1 - result if node.maximizing_player else result
+
+    def search(self, state, depth=None, maximizing_player=True, max_iterations=None):
+        """Start the MCTS algorithm.
+        :param state: The state to start from.
+        :param depth: Not used, the playouts go on to the end of the game.
+        :param maximizing_player: Whether player 1 is to move.
+        :param max_iterations: The maximum number of iterations, None to search until the deadline of the state.
+        :return: A tuple: (The win rate of player 1 with the most visited move,
+                           The direction of the move in case of max node or None in min mode),
+                 (None, None) if no iteration was completed.
+        """
+        if self.root is None or self.root.maximizing_player != maximizing_player:
+            self.root = MCTSNode(None, maximizing_player)
+        root = self.root
+        iteration_time = 0
+        try:
+            while max_iterations is None or self.nodes < max_iterations:
+                self.check_deadline(state)
+                start_time = time.monotonic()
+                # an iteration can take milliseconds (a batch of playouts), do not start one that would not end in time
+                if start_time + iteration_time >= self.deadline:
+                    break
+                self.iterate(state, root)
+                iteration_time = max(iteration_time, time.monotonic() - start_time)
+        except SearchTimeout:
+            pass
+
+        if not root.children:
+            return None, None
+        best = max(root.children, key=lambda child: child.visits)
+        win_rate = best.total / best.visits
+        if not maximizing_player:
+            return 1 - win_rate, None
+        return win_rate, tuple(map(operator.sub, best.move, state.pos))
@@ -0,0 +1,277 @@
+"""Retrograde endgame tablebase: the exact result of every position with a few free cells left, for small boards.
+Build the tablebase of a board from the project root with, e.g.:
+    python Tablebase.py -board default_board.csv -max_free 3
+"""
+import argparse
+import glob
+import itertools
+import os
+import sys
+import numpy as np
+from SearchAlgos import ExactScore
+import utils
+
+
+BOARDS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'boards')
+
+
+def tablebase_path(board_file_name):
+    """Returns the path of the tablebase of a board csv file in the boards directory.
+    """
+    return os.path.join(BOARDS_DIR, os.path.splitext(board_file_name)[0] + '.tb')
+
+
+class Tablebase:
+    """The result of a position once no fruit can be eaten anymore, when the scores only change by the penalties:
+    only the player to move, both players or only the other one is penalized. A position is the free cells
+    the players can reach (at most max_free), the cells of the players and whether the player to move moved first.
+    """
+    HEADER = np.dtype([('fingerprint', '<u8'), ('height', '<u8'), ('width', '<u8'), ('max_free', '<u8')])
+
+    def __init__(self, board, max_free, table=None):
+        """
+        input:
+            - board: np.array, the start board (only its blocked cells are used).
+            - max_free: the maximum number of reachable free cells of a position in the tablebase.
+            - table: the bytes of the layers (e.g. an np.memmap), None for an empty table.
+        """
+        self.shape = board.shape
+        self.max_free = max_free
+        self.fingerprint = utils.board_fingerprint(board)
+        self.neighbors = utils.neighbor_table(board.shape)
+        self.cells = [(int(i), int(j)) for i, j in zip(*np.where(board != -1))]
+        self.cell_ids = {cell: cell_id for cell_id, cell in enumerate(self.cells)}
+        # (cell, the cell next to it) -> the direction between them, for slot()
+        self.adjacent = {(cell, utils.tup_add(cell, d)): direction
+                         for cell in self.cells for direction, d in enumerate(utils.get_directions())}
+        n = len(self.cells)
+        self.binomial = [[self.choose(m, k) for k in range(max_free + 1)] for m in range(n + 1)]
+        self.offsets = [0]
+        for k in range(max_free + 1):
+            self.offsets.append(self.offsets[-1] + self.binomial[n][k] * (4 * k + 1) ** 2)
+        self.table = table if table is not None else np.zeros(self.offsets[-1], dtype=np.uint8)
+        self.probes = 0
+        self.hits = 0
+        self.anchor = None  # the last move (entry of the undo stack) of the anchor position
+        self.anchor_depth = -1  # the undo depth of the anchor position, -1 for no anchor
+        self.anchor_free = 0  # the free cells reachable by the players in the anchor position
+
+    @staticmethod
+    def choose(m, k):
+        result = 1
+        for i in range(k):
+            result = result * (m - i) // (i + 1)
+        return result
+
+    def rank(self, cell_ids):
+        """Returns the rank of a sorted tuple of cell ids among the subsets of its size.
+        """
+        return sum(self.binomial[cell_id][i + 1] for i, cell_id in enumerate(cell_ids))
+
+    def slot(self, cell, free_cells):
+        """Returns the slot of a player's cell, for the sorted tuple of free cells: 1 + 4 * j + d for the lowest
+        free cell j next to it and the direction d from that cell, or 0 if the player has no free cell next to it.
+        """
+        adjacent = self.adjacent
+        for j, free_cell in enumerate(free_cells):
+            d = adjacent.get((free_cell, cell))
+            if d is not None:
+                return 1 + 4 * j + d
+        return 0
+
+    def index(self, cell_ids, slot_a, slot_b):
+        """A perfect hash of a position: the offset of the layer of k free cells, plus the rank of the cells
+        among the k-subsets of the cells of the board times (4k + 1) ** 2, plus the slots of the players.
+        """
+        k = len(cell_ids)
+        slots = 4 * k + 1
+        return self.offsets[k] + (self.rank(cell_ids) * slots + slot_a) * slots + slot_b
+
+    def probe(self, state, player_index, first_player):
+        """Returns the result for the player to move (1 only the rival is penalized, 0 both, -1 only the player),
+        or None if the position is not in the tablebase: more than max_free reachable free cells,
+        or a fruit in one of them.
+        input:
+            - state: the GameState of the position.
+            - player_index: the player to move (1 or 2 of the state).
+            - first_player: the player (1 or 2 of the state) that moved first in the game.
+        """
+        self.probes += 1
+        board = state.board
+        pos, rival_pos = (state.pos, state.rival_pos) if player_index == 1 else (state.rival_pos, state.pos)
+        reached, frontier = set(), [pos, rival_pos]
+        while frontier:
+            cell = frontier.pop()
+            for neighbor in self.neighbors[cell]:
+                if neighbor not in reached and board[neighbor] not in (-1, 1, 2):
+                    if board[neighbor] > 2 or len(reached) == self.max_free:
+                        return None
+                    reached.add(neighbor)
+                    frontier.append(neighbor)
+
+        free_cells = sorted(reached, key=self.cell_ids.get)
+        cell_ids = tuple(self.cell_ids[cell] for cell in free_cells)
+        value = self.table.item(self.index(cell_ids, self.slot(pos, free_cells), self.slot(rival_pos, free_cells)))
+        # bits 0-1 hold the result when the player to move moved second and bits 2-3 when it moved first: 0 for
+        # no such position, 1 only the player to move is penalized, 2 both are and 3 only the other player is
+        code = (value >> 2 if player_index == first_player else value) & 3
+        if code == 0:
+            return None
+        self.hits += 1
+        return code - 2
+
+    def set_anchor(self, state):
+        """Makes the state the anchor position: counts the free cells the players can reach in it.
+        The players set it at the root of every move, so the bounds below it are as tight as they can be.
+        """
+        board = state.board
+        reached, frontier = set(), [state.pos, state.rival_pos]
+        while frontier:
+            for neighbor in self.neighbors[frontier.pop()]:
+                if neighbor not in reached and board[neighbor] not in (-1, 1, 2):
+                    reached.add(neighbor)
+                    frontier.append(neighbor)
+        self.anchor = state.undo_stack[state.undo_depth - 1] if state.undo_depth > 0 else None
+        self.anchor_depth = state.undo_depth
+        self.anchor_free = len(reached)
+
+    def reachable_bound(self, state):
+        """Returns an upper bound on the number of free cells the players can reach in the state.
+        The state is below the anchor if the last move of the anchor is still on its undo stack (a taken back move
+        is overwritten by the next one), else the state becomes the anchor.
+        """
+        depth = self.anchor_depth
+        if depth >= 0 and state.undo_depth >= depth and (depth == 0 or state.undo_stack[depth - 1] is self.anchor):
+            return self.anchor_free - (state.undo_depth - depth)
+        self.set_anchor(state)
+        return self.anchor_free
+
+    def utility(self, state, penalty_score):
+        """Returns the utility of a position searched by the AB players (after a move, the player that did not
+        make it is to move) as their utility functions value the end of the game: inf for a win of player 1,
+        -inf for a loss and an ExactScore of 0 for a tie (the search stops on all of them),
+        or None if it is not in the tablebase.
+        """
+        if state.undo_depth == 0 or self.reachable_bound(state) > self.max_free:
+            return None
+        last_player = state.undo_stack[state.undo_depth - 1][0]
+        result = self.probe(state, 3 - last_player, state.undo_stack[0][0])
+        if result is None:
+            return None
+        if last_player == 1:  # the rival is to move
+            result = -result
+        # only the penalties of the result are left to change the scores
+        score = state.fruits_score - state.rival_fruits_score + result * penalty_score
+        if score > 0:
+            return float('inf')
+        elif score < 0:
+            return float('-inf')
+        return ExactScore(0)
+
+    def solve(self):
+        """Fills the table, layer by layer: a move takes a cell out of the free cells, so a layer is solved
+        from the one below it.
+        """
+        for k in range(self.max_free + 1):
+            for cell_ids in itertools.combinations(range(len(self.cells)), k):
+                self.solve_free_cells(cell_ids)
+            print(f'layer {k} solved', file=sys.stderr)
+
+    def solve_free_cells(self, cell_ids):
+        """Solves all the positions of the sorted tuple of free cell ids.
+        """
+        k = len(cell_ids)
+        slots = 4 * k + 1
+        free_cells = [self.cells[cell_id] for cell_id in cell_ids]
+        free_set = set(free_cells)
+        # the cell of every slot, None for slot 0 (no free neighbor) and for the slots of no cell
+        slot_cells = [None] * slots
+        for j, free_cell in enumerate(free_cells):
+            for d, neighbor in enumerate(self.neighbors_by_direction(free_cell)):
+                slot = 1 + 4 * j + d
+                if neighbor is not None and neighbor not in free_set and self.slot(neighbor, free_cells) == slot:
+                    slot_cells[slot] = neighbor
+        valid = np.array([slot == 0 or cell is not None for slot, cell in enumerate(slot_cells)])
+
+        # best[a, b, first]: the result for the player to move in a, the best of its moves so far
+        best = np.full((slots, slots, 2), -2, dtype=np.int8)
+        for c_index, c in enumerate(free_cells):
+            movers = [slot for slot, cell in enumerate(slot_cells) if cell is not None and c in self.neighbors[cell]]
+            if not movers:
+                continue
+            child_cells = free_cells[:c_index] + free_cells[c_index + 1:]
+            child_ids = cell_ids[:c_index] + cell_ids[c_index + 1:]
+            child_slots = 4 * (k - 1) + 1
+            child_start = self.index(child_ids, 0, 0)
+            child = self.table[child_start:child_start + child_slots ** 2].reshape(child_slots, child_slots)
+            # in the child the other player (in b) is to move and the player that moved is in c
+            b_slots = np.array([self.slot(cell, child_cells) if cell is not None else 0 for cell in slot_cells])
+            codes = child[b_slots, self.slot(c, child_cells)]
+            # the first flag of the child is the opposite of the first flag of the position
+            child_results = np.stack([(codes >> 2) & 3, codes & 3], axis=1).astype(np.int8) - 2
+            best[movers] = np.maximum(best[movers], -child_results[np.newaxis])
+
+        # a player with no moves is penalized, and the game ends unless it moved first and the other one can move
+        stuck_results = np.full((slots, 2), -1, dtype=np.int8)
+        stuck_results[0, 1] = 0
+        best[0] = stuck_results
+
+        codes = (best + 2).astype(np.uint8)
+        values = codes[:, :, 0] | (codes[:, :, 1] << 2)
+        # no position with a player in a slot of no cell, or both players in the same cell
+        values[~valid, :] = 0
+        values[:, ~valid] = 0
+        values[np.arange(1, slots), np.arange(1, slots)] = 0
+        start = self.index(cell_ids, 0, 0)
+        self.table[start:start + slots ** 2] = values.ravel()
+
+    def neighbors_by_direction(self, cell):
+        """Yields the cell in every direction from cell, None where it is off the board or blocked.
+        """
+        for d in utils.get_directions():
+            neighbor = utils.tup_add(cell, d)
+            yield neighbor if neighbor in self.cell_ids else None
+
+    def save(self, path):
+        header = np.array([(self.fingerprint,) + self.shape + (self.max_free,)], dtype=self.HEADER)
+        with open(path, 'wb') as f:
+            header.tofile(f)
+            self.table.tofile(f)
+
+    @classmethod
+    def load(cls, path, board):
+        """Returns the tablebase of the file, for the start board it was built for, with the table memory-mapped.
+        """
+        header = np.fromfile(path, dtype=cls.HEADER, count=1)[0]
+        table = np.memmap(path, dtype=np.uint8, mode='r', offset=cls.HEADER.itemsize)
+        return cls(board, int(header['max_free']), table)
+
+    @classmethod
+    def find(cls, board, directory=BOARDS_DIR):
+        """Returns the tablebase of the board in the directory, or None if it has no tablebase.
+        input:
+            - board: np.array, the start board, as given in set_game_params.
+        """
+        fingerprint = utils.board_fingerprint(board)
+        for path in sorted(glob.glob(os.path.join(directory, '*.tb'))):
+            header = np.fromfile(path, dtype=cls.HEADER, count=1)
+            if len(header) and (int(header[0]['fingerprint']), int(header[0]['height']),
+                                int(header[0]['width'])) == (fingerprint,) + board.shape:
+                return cls.load(path, board)
+        return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-board', default='default_board.csv', type=str,
+                        help='Name of board file (.csv).')
+    parser.add_argument('-max_free', default=3, type=int,
+                        help='Maximum number of free cells reachable by the players in a position of the tablebase.')
+    args = parser.parse_args()
+
+    from GameWrapper import GameWrapper
+    size, blocks, starts = utils.get_board_from_csv(args.board)
+    tablebase = Tablebase(GameWrapper.set_initial_board(size, blocks, starts), args.max_free)
+    tablebase.solve()
+    tablebase.save(tablebase_path(args.board))
+    print(f'{len(tablebase.table)} bytes written to {tablebase_path(args.board)}')
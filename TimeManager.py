@@ -0,0 +1,80 @@
+"""Time management of the players with a global game time: how long a move searches, and whether to start
+the next deepening iteration of its search.
+"""
+import time
+
+
+class TimeManager:
+    """Splits the game time left between the moves left, estimated from the area the player can reach,
+    and stops the deepening of a move by how its search goes (see next_iteration).
+    """
+    UNSTABLE_FACTOR = 2.0
+    STABLE_FACTOR = 0.5
+    STABLE_ITERATIONS = 4
+    MAX_BRANCHING = 4.0  # the effective branching factor when it is not known yet, and its cap
+    # the median of the moves the player made until the end of the game per cell it could reach, in games of
+    # GlobalTimeABPlayer against itself on the boards of the repo
+    SHARED_MOVES_PER_CELL = 0.3
+    OWN_MOVES_PER_CELL = 0.65
+
+    def __init__(self, game_time, regions):
+        """
+        input:
+            - game_time: the game time of the player (sec), for all of its moves.
+            - regions: the RegionIndex of the player's GameState.
+        """
+        self.game_time = game_time
+        self.regions = regions
+        self.used_time = 0
+        self.start_time = None
+        self.budget = 0  # the time (sec) of the current move, from its start time
+        self.move_limit = 0  # the time (sec) at which the search of the current move is aborted
+
+    def moves_left(self):
+        state = self.regions.state
+        area = self.regions.area(state.pos)
+        if self.regions.same_region():
+            return max(1, round(area * self.SHARED_MOVES_PER_CELL))
+        return max(1, round(area * self.OWN_MOVES_PER_CELL))
+
+    def start_move(self, start_time, time_limit):
+        """Sets the budget of the move of the player's state, called at the start of make_move.
+        Returns the time (sec) from start_time at which the move is aborted, to set as the time limit of the state.
+        """
+        self.start_time = start_time
+        time_left = self.game_time - self.used_time
+        share = time_left / self.moves_left()
+        # the search is aborted at UNSTABLE_FACTOR shares, so a move can not use up the time of the next ones.
+        # The only safety margin is the one of the search, which is aborted SearchAlgos.BUFFER before the limit
+        self.move_limit = max(0, min(time_limit, time_left, share * self.UNSTABLE_FACTOR))
+        self.budget = min(share, self.move_limit)
+        return self.move_limit
+
+    def end_move(self):
+        """Called at the end of make_move, the time of the move is taken from the game time.
+        """
+        self.used_time += time.time() - self.start_time
+
+    def next_iteration(self, iterations):
+        """Returns whether to start the next iteration of the search: while the budget is not used up (extended while
+        the best move changes, cut once it is stable), if it is predicted to end before the search is aborted.
+        input:
+            - iterations: the (depth, score, direction, nodes, time) of the iterations completed so far,
+                          as IterativeDeepening keeps them, time is from the start of the move.
+        """
+        _, _, direction, nodes, elapsed = iterations[-1]
+        budget = self.budget
+        if len(iterations) >= 2 and iterations[-2][2] != direction:
+            budget *= self.UNSTABLE_FACTOR
+        elif len(iterations) > self.STABLE_ITERATIONS and \
+                all(iteration[2] == direction for iteration in iterations[-self.STABLE_ITERATIONS - 1:]):
+            budget *= self.STABLE_FACTOR
+        budget = min(budget, self.move_limit)
+
+        branching = self.MAX_BRANCHING
+        last_time = elapsed
+        if len(iterations) >= 2:
+            last_time -= iterations[-2][4]
+            if iterations[-2][3] > 0:
+                branching = min(max(nodes / iterations[-2][3], 1.0), self.MAX_BRANCHING)
+        return elapsed < budget and elapsed + last_time * branching <= self.move_limit
@@ -0,0 +1,37 @@
+"""Benchmarks for the search engine, one module per benchmark in benchmarks/.
+Run from the project root, e.g.:
+    python benchmark.py tt -board rectangle_board.csv -move_time 2
+"""
+import argparse
+import importlib
+import numpy as np
+
+
+if __name__ == "__main__":
+    benchmarks = ['tt', 'ordering', 'pvs', 'bitboard', 'scores', 'parallel', 'parallel_pv', 'ponder', 'endgame',
+                  'territory', 'regions', 'evalcache', 'succ', 'selective', 'mcts', 'mcts_time', 'playouts', 'book',
+                  'tablebase', 'persist', 'time', 'setup', 'importtime']
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('benchmark', type=str, choices=benchmarks,
+                        help='The benchmark to run.')
+    parser.add_argument('-board', default='rectangle_board.csv', type=str,
+                        help='Name of board file (.csv).')
+    parser.add_argument('-move_time', default=2, type=float,
+                        help='Time (sec) for each searched move.')
+    parser.add_argument('-depth', default=16, type=int,
+                        help='Depth for the fixed depth benchmarks.')
+    parser.add_argument('-processes', default=4, type=int,
+                        help='Number of worker processes for the parallel benchmarks.')
+    parser.add_argument('-repeat', default=20, type=int,
+                        help='Number of timed calls for the micro benchmarks.')
+    parser.add_argument('-seed', default=0, type=int,
+                        help='Seed for the random fruits placement.')
+    parser.add_argument('-import_budget', default=300, type=float,
+                        help='Budget (ms) of the import time of the headless startup, for the importtime check.')
+    args = parser.parse_args()
+
+    np.random.seed(args.seed)
+    # only the module of the benchmark is imported
+    name = 'bench_' + args.benchmark
+    getattr(importlib.import_module('benchmarks.' + name), name)(args)
@@ -0,0 +1,23 @@
+"""The search of the Bitboard backend against the GameState one.
+"""
+import time
+from benchmarks.common import create_player
+
+
+def bench_bitboard(args):
+    from Bitboard import Bitboard
+    from SearchAlgos import AlphaBeta
+    print('ndarray vs bitboard backend on', args.board, 'searching to depth', args.depth)
+    player = create_player('AlphabetaPlayer', args.board, args.seed)
+    backends = {'ndarray': (player.state,
+                            lambda state: len(state.succ(state.pos)) - len(state.succ(state.rival_pos))),
+                'bitboard': (Bitboard(player.board, player.state.fruits),
+                             lambda state: state.mobility(state.pos) - state.mobility(state.rival_pos))}
+    for name, (state, utility) in backends.items():
+        minimax_algo = AlphaBeta(utility, state.succ, state.perform_move, None)
+        start_time = time.time()
+        state.start_time, state.time_limit = start_time, 10 ** 6
+        score, direction = minimax_algo.search(state, args.depth, True)
+        run_time = time.time() - start_time
+        print(f'  {name:8}  score: {score}  direction: {direction}  nodes: {minimax_algo.nodes}  '
+              f'time: {run_time:.2f}s  nodes/sec: {minimax_algo.nodes / run_time:.0f}')
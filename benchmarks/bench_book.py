@@ -0,0 +1,28 @@
+"""Game time of GlobalTimeABPlayer with and without the opening book.
+"""
+import time
+from benchmarks.common import create_player
+
+
+def bench_book(args):
+    print('GlobalTimeABPlayer with and without the opening book on', args.board, 'for', args.depth, 'moves',
+          'with', args.move_time, 'seconds for a move')
+    for use_book in [False, True]:
+        player = create_player('GlobalTimeABPlayer', args.board, args.seed, game_time=args.move_time * args.depth)
+        if not use_book:
+            player.book = None
+        times = []
+        for _ in range(args.depth):
+            if not player.state.succ(player.state.pos):
+                break
+            start_time = time.time()
+            player.make_move(args.move_time, [0, 0])
+            times.append(time.time() - start_time)
+            rival_moves = player.state.succ(player.state.rival_pos)
+            if not rival_moves:
+                break
+            player.set_rival_move(rival_moves[0])
+        time_left = args.move_time * args.depth - player.time_manager.used_time
+        print(f'  book={str(use_book):5}  book moves: {player.book.hits if player.book else 0}  '
+              f'total time: {sum(times):.2f}s  game time left: {time_left:.2f}s')
+        print('    time per move:', ' '.join(f'{t:.2f}' for t in times))
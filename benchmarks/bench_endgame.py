@@ -0,0 +1,77 @@
+"""The endgame solver against AlphaBeta, checked by brute force on small regions.
+"""
+import sys
+import time
+import numpy as np
+import utils
+from benchmarks.common import create_player
+
+
+def bench_endgame(args):
+    from Endgame import EndgameSolver
+    from SearchAlgos import AlphaBeta, IterativeDeepening, MoveOrdering
+    print('Endgame solver vs AlphaBeta on', args.board, 'walled off at the start, with', args.move_time,
+          'seconds for a move')
+    player = create_player('AlphabetaPlayer', args.board, args.seed)
+    state = player.state
+    # block the column (or the row) of the player to wall the players off from each other
+    if state.pos[1] != state.rival_pos[1]:
+        wall = [(i, state.pos[1]) for i in range(player.board.shape[0])]
+    else:
+        wall = [(state.pos[0], j) for j in range(player.board.shape[1])]
+    for cell in wall:
+        if player.board[cell] != 1:
+            player.board[cell] = -1
+
+    solver = EndgameSolver(player.board, player.penalty_score)
+    state.start_time, state.time_limit = time.time(), args.move_time
+    direction = solver.solve(state)
+    if direction is None:
+        print('  no endgame to solve (the players are not walled off or the player is stuck)')
+        return
+    print(f'  solver     direction: {direction}  nodes: {solver.nodes}  time: {time.time() - state.start_time:.2f}s')
+
+    # the score of every first move by brute force over all the walks of the players, when the regions are small
+    def walks(pos, visited, lifetime):
+        """Yields (length, fruits value) of every walk from pos until the player is stuck,
+        eating the fruits of its first lifetime moves.
+        """
+        stuck = True
+        for d in utils.get_directions():
+            next_pos = utils.tup_add(pos, d)
+            if next_pos not in visited and 0 <= next_pos[0] < player.board.shape[0] and \
+                    0 <= next_pos[1] < player.board.shape[1] and player.board[next_pos] not in (-1, 1, 2):
+                stuck = False
+                value = max(player.board[next_pos], 0) if lifetime > 0 else 0
+                for length, walk_value in walks(next_pos, visited | {next_pos}, lifetime - 1):
+                    yield length + 1, walk_value + value
+        if stuck:
+            yield 0, 0
+
+    if np.count_nonzero((player.board == 0) | (player.board > 2)) <= 40:
+        rival_length = max(length for length, _ in walks(state.rival_pos, set(), 0))
+        need = rival_length if state.undo_depth == 0 else rival_length + 1
+        # with the fruits of the game and with fruits that are removed after the next 2 moves of the player
+        for fruits_moves in [solver.fruits_moves, state.undo_depth + 4]:
+            solver.fruits_moves = fruits_moves
+            direction = solver.solve(state)
+            lifetime = (fruits_moves - state.undo_depth + 1) // 2
+            scores = {}
+            for d in utils.get_directions():
+                next_pos = utils.tup_add(state.pos, d)
+                if next_pos in state.succ(state.pos):
+                    scores[d] = max(value + max(player.board[next_pos], 0) + solver.penalties(length + 1, need)
+                                    for length, value in walks(next_pos, {next_pos}, lifetime - 1))
+            ok = scores[tuple(direction)] == max(scores.values())
+            print(f'  brute force scores of the first moves (fruits removed after {fruits_moves} moves): {scores}  '
+                  f'{"OK" if ok else "FAILED"}')
+            if not ok:
+                sys.exit(1)
+
+    minimax_algo = AlphaBeta(player.utility, state.succ, state.perform_move, None, state.hash_key, player.tt,
+                             MoveOrdering())
+    search_driver = IterativeDeepening(minimax_algo)
+    state.start_time = time.time()
+    score, direction = search_driver.search(state, max_depth=player.board.size)
+    print(f'  AlphaBeta  direction: {direction}  nodes: {sum(iteration[3] for iteration in search_driver.iterations)}  '
+          f'time: {time.time() - state.start_time:.2f}s  depth reached: {len(search_driver.iterations)}')
@@ -0,0 +1,21 @@
+"""Nodes per second of the search with and without the h_minimax evaluation cache.
+"""
+import time
+from benchmarks.common import create_player
+
+
+def bench_evalcache(args):
+    print('h_minimax evaluation cache on', args.board, 'with', args.move_time, 'seconds for a move')
+    for use_cache in [False, True]:
+        player = create_player('AlphabetaPlayer', args.board, args.seed)
+        if not use_cache:
+            player.eval_cache = None
+        state, search_driver = player.state, player.search_driver
+        state.start_time, state.time_limit = time.time(), args.move_time
+        search_driver.search(state, max_depth=player.board.size)
+        nodes = sum(iteration[3] for iteration in search_driver.iterations)
+        run_time = search_driver.iterations[-1][4]
+        cache = player.eval_cache
+        print(f'  cache={str(use_cache):5}  depth reached: {len(search_driver.iterations)}  nodes: {nodes}  '
+              f'nodes/sec: {nodes / run_time:.0f}  '
+              f'hits: {cache.hits if cache else 0}  misses: {cache.misses if cache else 0}')
@@ -0,0 +1,39 @@
+"""Check of the import time of the headless startup of main.py.
+"""
+import os
+import re
+import subprocess
+import sys
+
+
+def bench_importtime(args):
+    """Fails (exits with 1) if the headless startup of main.py imports matplotlib,
+    or if its imports take more than the import budget.
+    """
+    print('Import time of main.py (headless startup), best of', args.repeat, 'runs, budget:',
+          args.import_budget, 'ms')
+    best, matplotlib_modules = None, []
+    for _ in range(args.repeat):
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import main'],
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, universal_newlines=True)
+        total = 0
+        for line in result.stderr.splitlines():
+            # import time: self [us] | cumulative | imported package (indented by its nesting)
+            match = re.match(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)', line)
+            if match is None:
+                continue
+            cumulative, indent, module = int(match.group(2)), match.group(3), match.group(4)
+            if len(indent) == 1:  # a module imported by the command itself
+                total += cumulative
+            if module.split('.')[0] == 'matplotlib':
+                matplotlib_modules.append(module)
+        best = total if best is None else min(best, total)
+    print(f'  import time: {best / 1000:.1f}ms  matplotlib modules imported: {len(set(matplotlib_modules))}')
+    if matplotlib_modules:
+        print('  FAILED: the headless startup imports matplotlib')
+        sys.exit(1)
+    if best / 1000 > args.import_budget:
+        print('  FAILED: the headless startup is over the import budget')
+        sys.exit(1)
+    print('  OK')
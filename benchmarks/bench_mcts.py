@@ -0,0 +1,39 @@
+"""Games of MCTSPlayer against CompetePlayer.
+"""
+import os
+import re
+import subprocess
+import sys
+
+
+def play_game(player1, player2, board, move_time):
+    """Plays a game with main.py in a new process (the game exits the process when it ends).
+    Returns (the winner: 1, 2 or 0 for a tie, the scores of both players, whether a player ran out of time).
+    """
+    command = [sys.executable, 'main.py', '-player1', player1, '-player2', player2, '-board', board,
+               '-move_time', str(move_time), '-terminal_viz', '-dont_print_game']
+    output = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, universal_newlines=True,
+                            env=dict(os.environ, MPLBACKEND='Agg')).stdout
+    winner = 0
+    match = re.search(r'Player (\d) Won!', output)
+    if match:
+        winner = int(match.group(1))
+    scores = tuple(float(score) for score in re.search(r'scores: (\S+), (\S+)', output).groups())
+    return winner, scores, 'Time Up' in output
+
+
+def bench_mcts(args):
+    print('MCTSPlayer vs CompetePlayer on', args.board, 'with', args.move_time, 'seconds for a move,',
+          args.repeat, 'games in each seat')
+    results = {'MCTSPlayer': [0, 0, 0], 'CompetePlayer': [0, 0, 0]}  # wins, ties, losses
+    time_ups = 0
+    for seats in [('MCTSPlayer', 'CompetePlayer'), ('CompetePlayer', 'MCTSPlayer')]:
+        for _ in range(args.repeat):
+            winner, scores, time_up = play_game(seats[0], seats[1], args.board, args.move_time)
+            time_ups += time_up
+            for seat, player in enumerate(seats, 1):
+                results[player][0 if winner == seat else 1 if winner == 0 else 2] += 1
+            print(f'  {seats[0]} vs {seats[1]}  winner: {seats[winner - 1] if winner else "tie"}  scores: {scores}')
+    for player, (wins, ties, losses) in results.items():
+        print(f'  {player:13}  wins: {wins}  ties: {ties}  losses: {losses}')
+    print(f'  games lost on time: {time_ups}')
@@ -0,0 +1,41 @@
+"""Check that the moves of MCTSPlayer keep the move time on big boards.
+"""
+import sys
+import time
+import numpy as np
+
+
+def bench_mcts_time(args):
+    """Fails (exits with 1) if a move of MCTSPlayer goes over the move time on the big boards,
+    playing against random moves of the rival.
+    """
+    print('MCTSPlayer move times on random 20x20 and 30x30 boards (10% blocked) with', args.move_time,
+          'seconds for a move,', args.repeat, 'moves')
+    from players.MCTSPlayer import Player
+    rand = np.random.RandomState(args.seed)
+    over_time = 0
+    for size in [20, 30]:
+        board = np.where(rand.rand(size, size) < 0.1, -1.0, 0.0)
+        board[0, 0], board[-1, -1] = 1, 2
+        player = Player(args.move_time * size * size, 300)
+        player.set_game_params(board.copy())
+        player.update_fruits({})
+        state = player.state
+        times = []
+        for _ in range(args.repeat):
+            if not state.succ(state.pos) or not state.succ(state.rival_pos):
+                break
+            start_time = time.time()
+            player.make_move(args.move_time, [0, 0])
+            times.append(time.time() - start_time)
+            rival_moves = state.succ(state.rival_pos)
+            if not rival_moves:
+                break
+            player.set_rival_move(rival_moves[rand.randint(len(rival_moves))])
+        over_time += sum(move_time > args.move_time for move_time in times)
+        print(f'  {size}x{size}  moves: {len(times)}  max move time: {max(times):.3f}s  '
+              f'mean: {np.mean(times):.3f}s  over time: {sum(move_time > args.move_time for move_time in times)}')
+    if over_time:
+        print('  FAILED: MCTSPlayer went over the move time')
+        sys.exit(1)
+    print('  OK')
@@ -0,0 +1,23 @@
+"""Cutoffs of AlphaBeta with and without the move ordering heuristics.
+"""
+from benchmarks.common import create_player, deepen
+
+
+def bench_ordering(args):
+    from SearchAlgos import AlphaBeta, MoveOrdering
+    print('Move ordering on', args.board, 'with', args.move_time, 'seconds for a move')
+    for use_ordering in [False, True]:
+        player = create_player('AlphabetaPlayer', args.board, args.seed)
+        state = player.state
+        move_ordering = MoveOrdering() if use_ordering else None
+        iterations, nodes = deepen(player, lambda: AlphaBeta(player.utility, state.succ, state.perform_move, None,
+                                                              move_ordering=move_ordering), args.move_time)
+        print(f'  ordering={use_ordering}  depth reached: {len(iterations)}  nodes: {nodes}')
+        prev_nodes = None
+        for depth, algo in enumerate(iterations, 1):
+            stats = algo.cutoff_stats()
+            ebf = stats['nodes'] / prev_nodes if prev_nodes else 0
+            print(f'    depth {depth:2}  nodes: {stats["nodes"]:7}  cutoffs: {stats["cutoffs"]:7}  '
+                  f'first move cutoffs: {stats["first_move_cutoff_rate"]:.0%}  '
+                  f'moves/node: {stats["branching_factor"]:.2f}  nodes(d)/nodes(d-1): {ebf:.2f}')
+            prev_nodes = stats['nodes']
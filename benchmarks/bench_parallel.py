@@ -0,0 +1,25 @@
+"""Depth and nodes of the parallel searches (root split and lazy SMP) against one process.
+"""
+import time
+from benchmarks.common import create_player
+
+
+def bench_parallel(args):
+    import players.CompetePlayer
+    print('Parallel search with', args.processes, 'processes on', args.board, 'with', args.move_time,
+          'seconds for a move')
+    for processes, parallel in [(0, 'root'), (args.processes, 'root'), (args.processes, 'lazy_smp')]:
+        players.CompetePlayer.Player.processes = processes
+        players.CompetePlayer.Player.parallel = parallel
+        player = create_player('CompetePlayer', args.board, args.seed)
+        state, search_driver = player.state, player.search_driver
+        # deepen for the whole move time, without the time manager (of the IterativeDeepening under LazySMP)
+        getattr(search_driver, 'search_driver', search_driver).time_manager = None
+        state.start_time, state.time_limit = time.time(), args.move_time
+        score, direction = search_driver.search(state, max_depth=player.board.size)
+        print(f'  processes={processes}  parallel={parallel:8}  depth reached: {len(search_driver.iterations)}  '
+              f'nodes: {sum(iteration[3] for iteration in search_driver.iterations)}  '
+              f'score: {score}  direction: {direction}  helper nodes: {getattr(search_driver, "helper_nodes", 0)}  '
+              f'tt hits: {player.tt.hits}/{player.tt.probes}')
+        if player.pool is not None:
+            player.pool.terminate()
@@ -0,0 +1,55 @@
+"""Check that the root split search finds the move and the pv of the search on one process.
+"""
+import sys
+import time
+import utils
+from benchmarks.common import create_player
+
+
+def make_plain_search_algo(penalty_score, state):
+    """Returns the AlphaBeta of a worker process of the parallel_pv check: AlphabetaPlayer's utility,
+    no transposition table, so the searches of the workers and of this process are the same.
+    """
+    from players.AlphabetaPlayer import Player
+    from SearchAlgos import AlphaBeta, MoveOrdering
+    player = Player(0, penalty_score)
+    player.state = state
+    player.eval_cache = utils.EvalCache()
+    return AlphaBeta(player.utility, state.succ, state.perform_move, None, move_ordering=MoveOrdering())
+
+
+def bench_parallel_pv(args):
+    """Fails (exits with 1) if the root-parallel search finds another score or principal variation
+    than the sequential AlphaBeta, searching to the same depth.
+    """
+    import functools
+    import multiprocessing
+    from SearchAlgos import ParallelRootSearch, init_search_worker
+    print('Principal variation of the root-parallel vs the sequential search on', args.board, 'to depth',
+          args.depth, 'with', args.processes, 'processes')
+    player = create_player('AlphabetaPlayer', args.board, args.seed)
+    state = player.state
+    pool = multiprocessing.Pool(args.processes, init_search_worker,
+                                (functools.partial(make_plain_search_algo, player.penalty_score), state))
+    sequential = make_plain_search_algo(player.penalty_score, state)
+    parallel = ParallelRootSearch(make_plain_search_algo(player.penalty_score, state), pool)
+    failed = False
+    try:
+        for depth in range(2, args.depth + 1):
+            results = []
+            for search_algo in [sequential, parallel]:
+                search_algo.new_search()
+                search_algo.move_ordering.clear()
+                state.start_time, state.time_limit = time.time(), 10 ** 6
+                score, _ = search_algo.search(state, depth, True)
+                results.append((score, list(search_algo.move_ordering.pv)))
+            same = results[0] == results[1]
+            failed = failed or not same
+            print(f'  depth {depth:2}  score: {results[0][0]:.2f}  pv: {results[0][1]}  '
+                  f'{"same" if same else f"DIFFERENT, parallel: {results[1]}"}')
+    finally:
+        pool.terminate()
+    if failed:
+        print('  FAILED: the root-parallel search differs from the sequential search')
+        sys.exit(1)
+    print('  OK')
@@ -0,0 +1,42 @@
+"""Depth of the search with its tables kept between the turns against cleared every turn.
+"""
+import random
+import time
+import numpy as np
+import utils
+from benchmarks.common import create_player
+
+
+def bench_persist(args):
+    print('Search state kept between the turns vs cleared every turn, AlphabetaPlayer on', args.board, 'for',
+          args.depth, 'moves with', args.move_time, 'seconds for a move')
+    for keep in [False, True]:
+        player = create_player('AlphabetaPlayer', args.board, args.seed)
+        state, search_driver = player.state, player.search_driver
+        rand = random.Random(args.seed)
+        depths, catch_up_times = [], []
+        for _ in range(args.depth):
+            if not state.succ(state.pos):
+                break
+            if not keep:
+                player.tt.clear()
+                search_driver.search_algo.move_ordering.clear()
+            state.start_time, state.time_limit = time.time(), args.move_time
+            score, direction = search_driver.search(state, max_depth=player.board.size)
+            if direction is None:
+                break
+            iterations = search_driver.iterations
+            if depths:  # the time to search again the depth the last search reached, two plies deeper in its tree
+                catch_up = [t for depth, _, _, _, t in iterations if depth == depths[-1] - 2]
+                if catch_up:
+                    catch_up_times.append(catch_up[0])
+            depths.append(len(iterations))
+            state.apply(1, utils.tup_add(state.pos, direction))
+            rival_moves = state.succ(state.rival_pos)
+            if not rival_moves:
+                break
+            state.apply(2, rand.choice(rival_moves))
+        print(f'  keep={str(keep):5}  mean depth reached: {np.mean(depths):.2f}  '
+              f'mean time to the last depth - 2: {np.mean(catch_up_times) * 1000:.1f}ms  '
+              f'tt hits: {player.tt.hits}/{player.tt.probes}')
+        print('    depth per move:', ' '.join(str(depth) for depth in depths))
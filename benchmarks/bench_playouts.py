@@ -0,0 +1,30 @@
+"""Playouts per second of the batched playouts against the single ones.
+"""
+import time
+from benchmarks.common import create_player
+
+
+def bench_playouts(args):
+    from Playouts import BatchPlayouts
+    from SearchAlgos import MCTS
+    print('One at a time vs batched playouts on', args.board)
+    player = create_player('MCTSPlayer', args.board, args.seed)
+    state = player.state
+    player.first_player = 1
+    mcts = MCTS(player.utility, state.succ, state.perform_move)
+    start_time = time.time()
+    for _ in range(args.repeat):
+        mcts.random_playout(state, True)
+    print(f'  python random  playouts/sec: {args.repeat / (time.time() - start_time):.0f}')
+    for policy in ['random', 'greedy']:
+        playouts = BatchPlayouts(state.board.shape, player.penalty_score, policy, seed=args.seed)
+        for n in [1, 16, 64, 256, 1024]:
+            start_time = time.time()
+            for _ in range(max(1, args.repeat * 16 // n)):
+                playouts.play(state, True, 1, n)
+            run_time = (time.time() - start_time) / max(1, args.repeat * 16 // n)
+            print(f'  batch {policy:6}  n: {n:4}  playouts/sec: {n / run_time:.0f}')
+        print(f'  {policy} playouts after each root move (1024 each):')
+        for next_pos, (win, tie, loss, diffs) in playouts.root_children(state, 1, 1024).items():
+            print(f'    {next_pos}  win: {win:.2f}  tie: {tie:.2f}  loss: {loss:.2f}  '
+                  f'score diff mean: {diffs.mean():7.1f}  std: {diffs.std():6.1f}')
@@ -0,0 +1,54 @@
+"""Check of pondering: the hits and misses, and the depth a hit reaches.
+"""
+import sys
+import time
+from benchmarks.common import create_player
+
+
+def bench_ponder(args):
+    """Fails (exits with 1) if a pondering player does not ponder, or searches less deep on a ponder hit
+    than without pondering.
+    """
+    import players.CompetePlayer
+    print('Pondering with', args.processes, 'processes on', args.board, 'with', args.move_time, 'seconds for a move,',
+          'the rival replying after a quarter of it')
+    failed, depth = False, 0
+    for ponder, use_book in [(False, False), (True, False), (True, True)]:
+        players.CompetePlayer.Player.processes = args.processes
+        players.CompetePlayer.Player.parallel = 'root'
+        players.CompetePlayer.Player.ponder = ponder
+        player = create_player('CompetePlayer', args.board, args.seed)
+        if use_book and player.book is None:
+            player.pool.terminate()
+            continue
+        if not use_book:
+            player.book = None
+        player.make_move(args.move_time, [0, 0])
+        # the rival plays the predicted move (if there is one), before the ponder search is done
+        rival_move = player.ponder_move if ponder and player.ponder_result is not None else None
+        if rival_move is None:
+            rival_move = player.state.succ(player.state.rival_pos)[0]
+        time.sleep(args.move_time / 4)
+        player.set_rival_move(rival_move)
+        book_hits = player.book.hits if use_book else 0
+        start_time = time.time()
+        player.make_move(args.move_time, [0, 0])
+        searched = not use_book or player.book.hits == book_hits  # not a book move
+        iterations = player.search_driver.iterations
+        print(f'  ponder={str(ponder):5}  book={str(use_book):5}  hits: {player.ponder_hits}  '
+              f'misses: {player.ponder_misses}  depth reached: {len(iterations)}  '
+              f'time to reach it: {iterations[-1][4] if iterations else 0:.2f}s  '
+              f'move time: {time.time() - start_time:.2f}s  tt hits: {player.tt.hits}/{player.tt.probes}')
+        if ponder and player.ponder_hits + player.ponder_misses == 0:
+            print('  FAILED: the player did not ponder')
+            failed = True
+        if not ponder:
+            depth = len(iterations)
+        elif player.ponder_hits and searched and len(iterations) < depth:
+            print('  FAILED: the search after the ponder hit is less deep than without pondering')
+            failed = True
+        player.stop_pondering()
+        player.pool.terminate()
+    if failed:
+        sys.exit(1)
+    print('  OK')
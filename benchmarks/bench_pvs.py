@@ -0,0 +1,20 @@
+"""Depth and nodes of the principal variation search against AlphaBeta.
+"""
+import time
+from benchmarks.common import create_player
+
+
+def bench_pvs(args):
+    from SearchAlgos import AlphaBeta, IterativeDeepening, MoveOrdering, PVS, TranspositionTable
+    print('AlphaBeta vs PVS on', args.board, 'with', args.move_time, 'seconds for a move')
+    for search_algo in [AlphaBeta, PVS]:
+        player = create_player('AlphabetaPlayer', args.board, args.seed)
+        state = player.state
+        minimax_algo = search_algo(player.utility, state.succ, state.perform_move, None, state.hash_key,
+                                   TranspositionTable(), MoveOrdering())
+        search_driver = IterativeDeepening(minimax_algo)
+        state.start_time, state.time_limit = time.time(), args.move_time
+        search_driver.search(state, max_depth=player.board.size)
+        print(f'  {search_algo.__name__:9}  depth reached: {len(search_driver.iterations)}  '
+              f'nodes: {sum(iteration[3] for iteration in search_driver.iterations)}')
+        print('    nodes per depth:', ' '.join(str(iteration[3]) for iteration in search_driver.iterations))
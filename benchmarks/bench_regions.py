@@ -0,0 +1,58 @@
+"""Reachable areas by the region index against the BFS, checked against labels from scratch.
+"""
+import random
+import sys
+import time
+import utils
+from benchmarks.common import create_player
+
+
+def bench_regions(args):
+    from Regions import RegionIndex
+    from SearchAlgos import AlphaBeta
+    print('Reachable area by BFS vs by the region index on', args.board, 'searching to depth', args.depth)
+    player = create_player('AlphabetaPlayer', args.board, args.seed)
+    state = player.state
+    regions = RegionIndex(state)
+    utilities = {'BFS': lambda state: (utils.h_successors_by_depth(state, state.pos, state.board.size)
+                                       - utils.h_successors_by_depth(state, state.rival_pos, state.board.size)),
+                 'regions': lambda state: regions.area(state.pos) - regions.area(state.rival_pos)}
+    for name, utility in utilities.items():
+        minimax_algo = AlphaBeta(utility, state.succ, state.perform_move, None)
+        start_time = time.time()
+        state.start_time, state.time_limit = start_time, 10 ** 6
+        score, direction = minimax_algo.search(state, args.depth, True)
+        run_time = time.time() - start_time
+        print(f'  {name:7}  score: {score}  direction: {direction}  nodes: {minimax_algo.nodes}  '
+              f'time: {run_time:.2f}s  nodes/sec: {minimax_algo.nodes / run_time:.0f}')
+    print(f'  region cache hits: {regions.hits}  misses: {regions.misses}')
+
+    # the labels of every new state of random games, from the state before vs from scratch
+    rand = random.Random(args.seed)
+    times, moves = {'incremental': 0, 'scratch': 0}, 0
+    for _ in range(args.repeat):
+        player = create_player('AlphabetaPlayer', args.board, args.seed)
+        state = player.state
+        regions = RegionIndex(state)
+        regions.area(state.pos)
+        player_index = 1
+        while True:
+            pos = state.pos if player_index == 1 else state.rival_pos
+            next_poses = state.succ(pos)
+            if not next_poses:
+                break
+            state.apply(player_index, rand.choice(next_poses))
+            moves += 1
+            start_time = time.time()
+            areas = (regions.area(state.pos), regions.area(state.rival_pos), regions.same_region())
+            times['incremental'] += time.time() - start_time
+            start_time = time.time()
+            scratch = RegionIndex(state)
+            scratch_areas = (scratch.area(state.pos), scratch.area(state.rival_pos), scratch.same_region())
+            times['scratch'] += time.time() - start_time
+            if areas != scratch_areas:
+                print(f'  FAILED: the incremental regions {areas} differ from the ones from scratch {scratch_areas}')
+                sys.exit(1)
+            player_index = 3 - player_index
+    print(f'  regions of {moves} states of {args.repeat} random games: '
+          + '  '.join(f'{name} {total / moves * 1e6:.0f}us' for name, total in times.items()))
@@ -0,0 +1,84 @@
+"""Search speed with the running fruits scores of GameState against rescanning the eaten fruits.
+"""
+import random
+import time
+from benchmarks.common import create_player
+
+
+def bench_scores(args):
+    from GameState import GameState
+    from SearchAlgos import AlphaBeta
+
+    class RescanState(GameState):
+        """The fruits scores are summed over all the eaten fruits after every move, as the players did before
+        the scores were kept as running totals.
+        """
+
+        def __init__(self, board):
+            GameState.__init__(self, board)
+            self.fruits_ate = {1: {}, 2: {}}
+
+        def apply(self, player_index, next_pos):
+            GameState.apply(self, player_index, next_pos)
+            fruit_val = self.undo_stack[self.undo_depth - 1][3]
+            if fruit_val:
+                self.fruits_ate[player_index][next_pos] = fruit_val
+            self.update_fruits_scores(player_index)
+
+        def undo(self):
+            player_index, _, next_pos, _ = self.undo_stack[self.undo_depth - 1]
+            GameState.undo(self)
+            self.fruits_ate[player_index].pop(next_pos, None)
+            self.update_fruits_scores(player_index)
+
+        def update_fruits_scores(self, player_index):
+            score = 0
+            for fruit in self.fruits_ate[player_index]:
+                score += self.fruits_ate[player_index][fruit]
+            if player_index == 1:
+                self.fruits_score = score
+            else:
+                self.rival_fruits_score = score
+
+    print('Running vs rescanned fruits scores on', args.board, 'searching to depth', args.depth)
+    player = create_player('AlphabetaPlayer', args.board, args.seed)
+    board, fruits = player.board.copy(), dict(player.state.fruits)
+
+    # a long game: both players walk to a fruit if there is one next to them, else to the cell with the fewest
+    # moves out of it (that still has one), which fills the board before getting stuck
+    state = GameState(board.copy(), debug=True)
+    moves, player_index = [], 1
+    while True:
+        pos = state.pos if player_index == 1 else state.rival_pos
+        next_poses = state.succ(pos)
+        if not next_poses:
+            break
+        fruit_poses = [next_pos for next_pos in next_poses if next_pos in fruits]
+        next_pos = random.choice(fruit_poses) if fruit_poses else \
+            min(next_poses, key=lambda next_pos: len(state.succ(next_pos)) or len(state.directions) + 1)
+        state.apply(player_index, next_pos)
+        moves.append((player_index, next_pos))
+        player_index = 3 - player_index
+    eaten = sum(1 for move in state.undo_stack[:state.undo_depth] if move[3])
+    print(f'  game length: {len(moves)} moves  fruits eaten: {eaten}')
+
+    def utility(state):
+        return state.fruits_score - state.rival_fruits_score
+
+    for moves_played in range(0, len(moves), max(len(moves) // 5, 2) & ~1):
+        times = {}
+        for state_class in [RescanState, GameState]:
+            state = state_class(board.copy())
+            for player_index, next_pos in moves[:moves_played]:
+                state.apply(player_index, next_pos)
+            minimax_algo = AlphaBeta(utility, state.succ, state.perform_move, None)
+            state.start_time, state.time_limit = time.time(), 10 ** 6
+            nodes = 0
+            while nodes < 3 * 10 ** 4:  # repeat small searches for a stable time
+                minimax_algo.new_search()
+                minimax_algo.search(state, args.depth, True)
+                nodes += max(minimax_algo.nodes, 1)
+            times[state_class] = (time.time() - state.start_time) / nodes
+        print(f'  after {moves_played:3} moves  nodes: {minimax_algo.nodes:7}  '
+              f'rescan: {times[RescanState] * 10 ** 6:.1f}us/node  running: {times[GameState] * 10 ** 6:.1f}us/node  '
+              f'saving: {1 - times[GameState] / times[RescanState]:.0%}')
@@ -0,0 +1,56 @@
+"""Depth and strength of the search with late move reductions and futility pruning.
+"""
+import random
+import time
+import numpy as np
+from benchmarks.common import create_player
+
+
+def bench_selective(args):
+    from SearchAlgos import AlphaBeta, IterativeDeepening, MoveOrdering, TranspositionTable
+    print('Selective search on', args.board, 'over', args.repeat, 'positions: fixed depth', args.depth,
+          'and', args.move_time, 'seconds for a move')
+    player = create_player('AlphabetaPlayer', args.board, args.seed)
+    state = player.state
+    # the positions after a few random moves of both players from the start
+    rand = random.Random(args.seed)
+    positions = []
+    for _ in range(args.repeat):
+        for player_index in [1, 2] * rand.randint(0, 4):
+            next_poses = state.succ(state.pos if player_index == 1 else state.rival_pos)
+            if not next_poses:
+                break
+            state.apply(player_index, rand.choice(next_poses))
+        if state.succ(state.pos) and state.succ(state.rival_pos):
+            positions.append(list(state.undo_stack[:state.undo_depth]))
+        while state.undo_depth:
+            state.undo()
+
+    def run(lmr, futility, position, **limits):
+        for player_index, pos, next_pos, _ in position:
+            state.apply(player_index, next_pos)
+        player.eval_cache.clear()
+        minimax_algo = AlphaBeta(player.utility, state.succ, state.perform_move, None, state.hash_key,
+                                 TranspositionTable(), MoveOrdering(), lmr=lmr,
+                                 futility_margin=player.futility_margin if futility else None)
+        search_driver = IterativeDeepening(minimax_algo, aspiration_window=5)
+        state.start_time = time.time()
+        state.time_limit = limits.get('time_budget', 10 ** 6)
+        score, direction = search_driver.search(state, max_depth=limits.get('max_depth', player.board.size))
+        while state.undo_depth:
+            state.undo()
+        return (score, direction, sum(iteration[3] for iteration in search_driver.iterations),
+                time.time() - state.start_time, len(search_driver.iterations), minimax_algo.cutoff_stats())
+
+    reference = [run(False, False, position, max_depth=args.depth) for position in positions]
+    for lmr, futility in [(False, False), (True, False), (False, True), (True, True)]:
+        results = [run(lmr, futility, position, max_depth=args.depth) for position in positions]
+        same_move = sum(result[1] == ref[1] for result, ref in zip(results, reference)) / len(positions)
+        score_error = np.mean([abs(result[0] - ref[0]) for result, ref in zip(results, reference)
+                               if abs(ref[0]) != float('inf')] or [0])
+        depths = [run(lmr, futility, position, time_budget=args.move_time)[4] for position in positions]
+        print(f'  lmr={str(lmr):5}  futility={str(futility):5}  nodes: {sum(r[2] for r in results):8}  '
+              f'time: {sum(r[3] for r in results):6.2f}s  same move: {same_move:4.0%}  '
+              f'score error: {score_error:.3f}  depth reached: {np.mean(depths):.1f}  '
+              f'reductions: {results[-1][5]["reductions"]}  re-searches: {results[-1][5]["re_searches"]}  '
+              f'futility prunes: {results[-1][5]["futility_prunes"]} (last position)')
@@ -0,0 +1,45 @@
+"""Check that the setup of a game does not warn.
+"""
+import random
+import sys
+import time
+import warnings
+import numpy as np
+from GameWrapper import GameWrapper
+import utils
+
+
+def bench_setup(args):
+    """Fails (exits with 1) if the setup of a game warns (e.g. of an animation that is deleted without being
+    rendered): the warnings of the setups are recorded, also the ones of the objects collected after them.
+    """
+    import gc
+    import matplotlib.pyplot as plt
+    from players.SimplePlayer import Player as SimplePlayer
+    print('Game setup time, animated vs headless (terminal_viz) GameWrapper, mean of', args.repeat, 'setups')
+    size, blocks, starts = utils.get_board_from_csv(args.board)
+    boards = {args.board: (size, blocks, starts)}
+    rand = random.Random(args.seed)
+    for side in [30, 60]:  # generated square boards, a tenth of the cells blocked
+        starts = [(0, 0), (side - 1, side - 1)]
+        cells = [(i, j) for i in range(side) for j in range(side) if (i, j) not in starts]
+        boards[f'generated {side}x{side}'] = ((side, side), rand.sample(cells, side * side // 10), starts)
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        for name, (size, blocks, starts) in boards.items():
+            for terminal_viz in [False, True]:
+                times = []
+                for _ in range(args.repeat):
+                    start_time = time.time()
+                    GameWrapper(size, blocks, starts, SimplePlayer(100, 300), SimplePlayer(100, 300),
+                                terminal_viz=terminal_viz, print_game_in_terminal=False)
+                    times.append(time.time() - start_time)
+                    plt.close('all')
+                print(f'  {name:20}  headless={str(terminal_viz):5}  setup time: {np.mean(times) * 1000:8.2f}ms')
+        gc.collect()
+    if caught:
+        for warning in caught:
+            print(f'  {warning.category.__name__}: {warning.message}')
+        print('  FAILED: the setup of a game warned')
+        sys.exit(1)
+    print('  OK')
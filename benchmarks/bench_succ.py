@@ -0,0 +1,33 @@
+"""succ with bounds checks against the precomputed neighbor table.
+"""
+import time
+from benchmarks.common import create_player
+
+
+def bench_succ(args):
+    print('succ with bounds checks vs the precomputed neighbor table on', args.board)
+    player = create_player('AlphabetaPlayer', args.board, args.seed)
+    state = player.state
+    board, directions = state.board, state.directions
+
+    def bounds_succ(pos):
+        # GameState.succ before the neighbor table
+        next_poses = []
+        for d in directions:
+            i = pos[0] + d[0]
+            j = pos[1] + d[1]
+            if 0 <= i < len(board) and 0 <= j < len(board[0]) and (board[i][j] not in [-1, 1, 2]):
+                next_poses.append((i, j))
+        return next_poses
+
+    cells = [(i, j) for i in range(board.shape[0]) for j in range(board.shape[1])]
+    assert all(sorted(bounds_succ(cell)) == sorted(state.succ(cell)) for cell in cells)
+    times = {}
+    for name, succ in [('bounds', bounds_succ), ('table', state.succ)]:
+        start_time = time.time()
+        for _ in range(args.repeat):
+            for cell in cells:
+                succ(cell)
+        times[name] = (time.time() - start_time) / (args.repeat * len(cells))
+        print(f'  {name:6}  time per call: {times[name] * 10 ** 6:.2f}us')
+    print(f'  speedup: {times["bounds"] / times["table"]:.1f}x')
@@ -0,0 +1,63 @@
+"""Searches to the end of the game with and without the tablebase.
+"""
+import random
+import time
+import numpy as np
+from benchmarks.common import create_player
+
+
+def bench_tablebase(args):
+    extra_free = 6
+    print('AlphaBeta searches to the end of the game with and without the tablebase on', args.board, 'for',
+          args.repeat, f'late positions of random games (the fruits removed, {extra_free} free cells more than',
+          'the tablebase positions)')
+    player = create_player('AlphabetaPlayer', args.board, args.seed)
+    if player.tablebase is None:
+        print('  the board has no tablebase, build it with Tablebase.py')
+        return
+    tablebase, state = player.tablebase, player.state
+    state.set_fruits({})
+    max_free = tablebase.max_free + extra_free
+
+    def free_cells():
+        reached, frontier = set(), [state.pos, state.rival_pos]
+        while frontier:
+            for neighbor in state.succ(frontier.pop()):
+                if neighbor not in reached:
+                    reached.add(neighbor)
+                    frontier.append(neighbor)
+        return len(reached)
+
+    rand = random.Random(args.seed)
+    probe_times, stats = [], {False: [], True: []}
+    while len(stats[True]) < args.repeat:
+        # random moves of both players until the players can reach at most max_free free cells
+        moves = 0
+        while state.succ(state.pos) and state.succ(state.rival_pos) and free_cells() > max_free:
+            state.apply(1, rand.choice(state.succ(state.pos)))
+            state.apply(2, rand.choice(state.succ(state.rival_pos)))
+            moves += 2
+        if state.succ(state.pos) and state.succ(state.rival_pos):
+            start_time = time.time()
+            tablebase.utility(state, player.penalty_score)
+            probe_times.append(time.time() - start_time)
+            for use_tablebase in [False, True]:
+                player.tablebase = tablebase if use_tablebase else None
+                player.tt.clear()
+                # every move takes one of the free cells, so the search reaches the end of the game
+                state.start_time, state.time_limit = time.time(), args.move_time
+                if use_tablebase:  # as the players do at the root of a move
+                    tablebase.set_anchor(state)
+                score, _ = player.search_driver.search(state, max_depth=2 * (max_free + 1))
+                stats[use_tablebase].append((time.time() - state.start_time,
+                                             sum(iteration[3] for iteration in player.search_driver.iterations),
+                                             len(player.search_driver.iterations)))
+        for _ in range(moves):
+            state.undo()
+    player.tablebase = tablebase
+    print(f'  probe                   mean time: {np.mean(probe_times) * 1e6:.1f}us  '
+          f'hits: {tablebase.hits}/{tablebase.probes}')
+    for use_tablebase, runs in stats.items():
+        times, nodes, depths = zip(*runs)
+        print(f'  search tablebase={str(use_tablebase):5}  mean time: {np.mean(times) * 1000:.2f}ms  '
+              f'mean nodes: {np.mean(nodes):.1f}  mean depth reached: {np.mean(depths):.1f}')
@@ -0,0 +1,56 @@
+"""The Voronoi territory against the BFS term of h_minimax.
+"""
+import sys
+import time
+import numpy as np
+import utils
+
+
+def bench_territory(args):
+    from GameState import GameState
+    print('Python BFS vs NumPy Voronoi territory on random boards (20% blocked), both counting at most min(shape) '
+          'cells as h_minimax calls them')
+
+    def list_bfs(board, pos, depth):
+        # h_successors_by_depth before the deque: list.pop(0), and -2 stamped on the (copied) board
+        state = GameState(board)
+        queue, count = [pos], 0
+        while queue:
+            s = queue.pop(0)
+            count += 1
+            for i in state.succ(s):
+                if board[i] != -2:
+                    queue.append(i)
+                    board[i] = -2
+            depth -= 1
+            if depth <= 0:
+                break
+        return count
+
+    rand = np.random.RandomState(args.seed)
+    for size in [50, 64, 100]:
+        board = np.where(rand.rand(size, size) < 0.2, -1.0, 0.0)
+        board[0, 0], board[-1, -1] = 1, 2
+        state = GameState(board)
+        depth = min(board.shape)
+        times = {}
+        for name, heuristic in [('list BFS', lambda: list_bfs(board.copy(), state.pos, depth)),
+                                ('deque BFS', lambda: utils.h_successors_by_depth(state, state.pos, depth)),
+                                ('voronoi', lambda: utils.h_territory(state, state.pos))]:
+            start_time = time.time()
+            for _ in range(args.repeat):
+                value = heuristic()
+            times[name] = (time.time() - start_time) / args.repeat
+            print(f'  {size}x{size}  {name:9}  value: {value:5}  time: {times[name] * 1000:.2f}ms')
+        print(f'  {size}x{size}  deque BFS speedup: {times["list BFS"] / times["deque BFS"]:.1f}x over the list BFS, '
+              f'voronoi time: {times["voronoi"] / times["deque BFS"]:.1f}x the deque BFS')
+
+        # the territory replaces the BFS term of h_minimax as is, both are in [0, min(shape)]
+        penalty_score = 300
+        bfs = utils.h_successors_by_depth(state, state.pos, depth)
+        v1 = {territory: utils.h_minimax(state, state.pos, penalty_score, territory)
+              - utils.h_minimax(state, state.pos, penalty_score, False) + bfs for territory in [False, True]}
+        if not all(0 <= value <= depth for value in v1.values()):
+            print(f'  FAILED: the v1 term of h_minimax is out of [0, {depth}]: {v1}')
+            sys.exit(1)
+        print(f'  {size}x{size}  v1 of h_minimax: BFS {v1[False]:.2f}  territory {v1[True]:.2f}  (at most {depth})')
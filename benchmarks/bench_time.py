@@ -0,0 +1,61 @@
+"""Check of the safety margin of a move, and the depth the time manager reaches with the game time.
+"""
+import random
+import sys
+import time
+import numpy as np
+from benchmarks.common import create_player
+
+
+def bench_time(args):
+    """Fails (exits with 1) if the search of a move with a 0.3 seconds time limit (and plenty of game time) is not
+    aborted one SearchAlgos.BUFFER before the time limit: the safety margin is kept once, by the search.
+    """
+    from SearchAlgos import AlphaBeta, SearchAlgos, SearchTimeout
+    player = create_player('GlobalTimeABPlayer', args.board, args.seed)
+    state, move_time = player.state, 0.3
+    state.start_time = time.time()
+    state.time_limit = player.time_manager.start_move(state.start_time, move_time)
+    try:  # a search too deep to end in time
+        AlphaBeta(player.utility, state.succ, state.perform_move, None).search(state, player.board.size, True)
+    except SearchTimeout:
+        pass
+    search_time = time.time() - state.start_time
+    expected = move_time - SearchAlgos.BUFFER / 1000
+    print(f'Time of a move with a time limit of {move_time}s: allotted {state.time_limit:.3f}s, '
+          f'search aborted after {search_time:.3f}s (expected {expected:.3f}s)')
+    if state.time_limit != move_time or abs(search_time - expected) > 0.02:
+        print('  FAILED: the safety margin of the move is not one buffer')
+        sys.exit(1)
+
+    print('GlobalTimeABPlayer with and without the time manager stopping the deepening on', args.board, 'for',
+          args.depth, 'moves with', args.move_time, 'seconds for a move and', args.move_time * args.depth / 2,
+          'seconds of game time')
+    for manage in [False, True]:
+        player = create_player('GlobalTimeABPlayer', args.board, args.seed, game_time=args.move_time * args.depth / 2)
+        player.book = None
+        if not manage:  # the search deepens until it is aborted at the limit of the move
+            player.search_driver.time_manager = None
+        rand = random.Random(args.seed)
+        times, depths, wasted = [], [], []
+        last_iterations = None
+        for _ in range(args.depth):
+            if not player.state.succ(player.state.pos):
+                break
+            start_time = time.time()
+            player.make_move(args.move_time, [0, 0])
+            times.append(time.time() - start_time)
+            iterations = player.search_driver.iterations
+            if iterations is not last_iterations:  # the move was searched (not a book or endgame move)
+                depths.append(len(iterations))
+                # the time of the iteration that was aborted, or of nothing after the last completed one
+                wasted.append(times[-1] - (iterations[-1][4] if iterations else 0))
+                last_iterations = iterations
+            rival_moves = player.state.succ(player.state.rival_pos)
+            if not rival_moves:
+                break
+            player.set_rival_move(rand.choice(rival_moves))
+        print(f'  time manager={str(manage):5}  game time used: {sum(times):.2f}s  mean depth: {np.mean(depths):.2f}  '
+              f'time after the last iteration: {sum(wasted):.2f}s')
+        print('    time per move:', ' '.join(f'{t:.2f}' for t in times))
+        print('    depth per move:', ' '.join(str(depth) for depth in depths))
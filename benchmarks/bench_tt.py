@@ -0,0 +1,17 @@
+"""Search depth and nodes of AlphaBeta with and without the transposition table.
+"""
+from benchmarks.common import create_player, deepen
+
+
+def bench_tt(args):
+    from SearchAlgos import AlphaBeta
+    print('Transposition table on', args.board, 'with', args.move_time, 'seconds for a move')
+    for use_tt in [False, True]:
+        player = create_player('AlphabetaPlayer', args.board, args.seed)
+        state = player.state
+        hash_key = state.hash_key if use_tt else None
+        iterations, nodes = deepen(player, lambda: AlphaBeta(player.utility, state.succ, state.perform_move, None,
+                                                              hash_key, player.tt), args.move_time)
+        depth = len(iterations)
+        print(f'  tt={str(use_tt):5}  depth reached: {depth:2}  depth/sec: {depth / args.move_time:.2f}  '
+              f'nodes: {nodes}  tt hits: {player.tt.hits}/{player.tt.probes}')
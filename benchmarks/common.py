@@ -0,0 +1,43 @@
+"""Helpers shared by the benchmarks.
+"""
+import random
+import sys
+import time
+from Game import Game
+from GameWrapper import GameWrapper
+import utils
+
+
+def create_player(player_type, board_file_name, seed=0, game_time=2000, penalty_score=300):
+    """Returns a player of the given type after set_game_params and update_fruits were called on it,
+    as at the start of a game on the given board (the fruits are placed by a seeded random).
+    """
+    random.seed(seed)
+    size, blocks, starts = utils.get_board_from_csv(board_file_name)
+    initial_board = GameWrapper.set_initial_board(size, blocks, starts)
+    game = Game(initial_board, starts, max_fruit_score=300, max_fruit_time=15, animated=False)
+
+    module_name = 'players.' + player_type
+    __import__(module_name)
+    player = sys.modules[module_name].Player(game_time, penalty_score)
+    player.set_game_params(game.get_map_for_player_i(player_id=0))
+    player.update_fruits(game.get_fruits_on_board())
+    return player
+
+
+def deepen(player, search_algo, time_limit):
+    """Runs the iterative deepening loop of the AB players from the player's current position.
+    Returns the search algo objects of the completed iterations (one per depth) and the total number of searched nodes.
+    """
+    player.state.start_time, player.state.time_limit = time.time(), time_limit
+    from SearchAlgos import SearchTimeout
+    iterations, nodes = [], 0
+    while len(iterations) < player.board.size:
+        algo = search_algo()
+        try:
+            algo.search(player.state, len(iterations) + 1, True)
+        except SearchTimeout:
+            return iterations, nodes + algo.nodes
+        nodes += algo.nodes
+        iterations.append(algo)
+    return iterations, nodes
@@ -2,32 +2,39 @@
 MiniMax Player with AlphaBeta pruning and global time
 """
 from players.AbstractPlayer import AbstractPlayer
-from SearchAlgos import AlphaBeta
-import numpy as np
+from Endgame import EndgameSolver
+from GameState import GameState
+from OpeningBook import OpeningBook
+from Regions import RegionIndex
+from SearchAlgos import AlphaBeta, IterativeDeepening, MoveOrdering, TranspositionTable
+from Tablebase import Tablebase
+from TimeManager import TimeManager
+import operator
 import time
 import utils
 import random
 
 
 class Player(AbstractPlayer):
+    # selective search of the AlphaBeta (see AlphaBeta), a bit less accurate but searches deeper in the same time
+    lmr = False  # late move reductions
+    futility = False  # futility pruning in the last ply
+
     def __init__(self, game_time, penalty_score):
         AbstractPlayer.__init__(self, game_time,
                                 penalty_score)  # keep the inheritance of the parent's (AbstractPlayer) __init__()
         self.penalty_score = penalty_score
         self.board = None
-        self.pos = None
-        self.rival_pos = None
-        self.fruits_dict = {}
-        self.fruits_ate = {}
-        self.rival_fruits_ate = {}
-        self.fruits_score = 0
-        self.rival_fruits_score = 0
-        self.first_turn = True
+        self.state = None
+        self.eval_cache = None
+        self.endgame = None
+        self.tablebase = None
+        self.book = None
+        self.regions = None
+        self.tt = None
+        self.search_driver = None
         self.game_time = game_time
-        self.curr_limit = 0
-        self.turns_left = 0
-        self.common_ratio = 0
-        self.spare_time = 0
+        self.time_manager = None
 
     def set_game_params(self, board):
         """Set the game parameters needed for this player.
@@ -38,15 +45,18 @@ class Player(AbstractPlayer):
         No output is expected.
         """
         self.board = board
-        pos = np.where(board == 1)
-        rival_pos = np.where(board == 2)
-        # convert pos to tuple of ints
-        self.pos = tuple(ax[0] for ax in pos)
-        self.rival_pos = tuple(ax[0] for ax in rival_pos)
-        attainable_locations = utils.h_successors_by_depth(self, self.pos, self.board.size)
-        self.turns_left = attainable_locations
-
-        self.common_ratio = self.get_best_common_ratio()
+        self.state = GameState(board, hashed=True)
+        self.eval_cache = utils.EvalCache()  # reused by all the turns of the game
+        self.endgame = EndgameSolver(board, self.penalty_score)
+        self.tablebase = Tablebase.find(board)  # None if the board has no tablebase
+        self.book = OpeningBook.find(board)  # None if the board has no book
+        self.tt = TranspositionTable()
+        minimax_algo = AlphaBeta(self.utility, self.state.succ, self.state.perform_move, None,
+                                 self.state.hash_key, self.tt, MoveOrdering(),
+                                 lmr=self.lmr, futility_margin=self.futility_margin if self.futility else None)
+        self.regions = RegionIndex(self.state)
+        self.time_manager = TimeManager(self.game_time, self.regions)
+        self.search_driver = IterativeDeepening(minimax_algo, aspiration_window=5, time_manager=self.time_manager)
 
     def make_move(self, time_limit, players_score):
         """Make move with this Player.
@@ -56,58 +66,31 @@ class Player(AbstractPlayer):
             - direction: tuple, specifing the Player's movement, chosen from self.directions
         """
         start_time = time.time()
-        buffer = 200
-        depth = 1
-        best_direction = None
-        best_score = float('-inf')
         limit = self.board.size
 
-        a1 = 0.25  # time for last move in seconds
-        n = self.turns_left
-        q = self.common_ratio
-
-        curr_move_time = a1 * pow(q, (n - 1))
-
-        if time_limit < curr_move_time:
-            curr_move_time = time_limit
-
-        time_left = (curr_move_time - (time.time() - start_time)) * 1000
-
-        if time_left <= buffer:
-            time_left = buffer + 50
-
-        self.turns_left -= 1
-
-        time_left += self.spare_time
-
-        # At least "buffer" in ms left to run
-        while time_left > buffer and depth <= limit:
-            minimax_algo = AlphaBeta(self.utility, self.succ, self.perform_move, None)
-            state = [self.pos, self.rival_pos, start_time, time_limit]
-            score, direction = minimax_algo.search(state, depth, True)
-            depth += 1
-            if best_direction is None or score > best_score:
-                best_score = score
-                best_direction = direction
-            time_left = (curr_move_time - (time.time() - start_time)) * 1000
-            time_left += self.spare_time
-
-        self.spare_time = 0
-        if time_left > buffer:
-            self.spare_time += (time_left - buffer)
-
+        # the search is aborted at the limit of the move, the time manager stops deepening before it
+        self.state.start_time = start_time
+        self.state.time_limit = self.time_manager.start_move(start_time, time_limit)
+        # a book move is played at once, the time of the move is spared for the next moves
+        best_direction = self.book.lookup(self.state) if self.book is not None else None
         if best_direction is None:
-            available_moves = self.succ(self.pos)
+            best_direction = self.endgame.solve(self.state)
+        if best_direction is None:  # the players can still reach each other
+            if self.tablebase is not None:  # the bounds of the probes are counted from the root
+                self.tablebase.set_anchor(self.state)
+            best_score, best_direction = self.search_driver.search(self.state, max_depth=limit)
+
+        if best_direction is None:  # no search was completed in time
+            available_moves = self.state.succ(self.state.pos)
             random.shuffle(available_moves)
-            best_direction = available_moves[0]
-
-        i = self.pos[0] + best_direction[0]
-        j = self.pos[1] + best_direction[1]
+            best_direction = tuple(map(operator.sub, available_moves[0], self.state.pos))
 
-        self.perform_move(self.pos, (i, j))
+        i = self.state.pos[0] + best_direction[0]
+        j = self.state.pos[1] + best_direction[1]
 
-        self.pos = (i, j)
+        self.state.apply(1, (i, j))
 
+        self.time_manager.end_move()
         return best_direction
 
     def set_rival_move(self, pos):
@@ -116,12 +99,7 @@ class Player(AbstractPlayer):
             - pos: tuple, the new position of the rival.
         No output is expected
         """
-        if self.first_turn:
-            self.first_turn = False
-            if self.board[pos] > 0:
-                self.rival_fruits_ate[pos] = self.board[pos]
-                self.rival_fruits_score += self.board[pos]
-        self.perform_move(self.rival_pos, pos)
+        self.state.apply(2, pos)
 
     def update_fruits(self, fruits_on_board_dict):
         """Update your info on the current fruits on board (if needed).
@@ -132,124 +110,49 @@ class Player(AbstractPlayer):
         No output is expected.
         """
         # use 'pass' instead of the following line.
-        self.fruits_dict = fruits_on_board_dict
-
-    ########## helper functions in class ##########
-    def update_fruits_scores(self, player_index):
-        if player_index == 1:
-            self.fruits_score = 0
-            for fruit in self.fruits_ate:
-                self.fruits_score += self.fruits_ate[fruit]
-        elif player_index == 2:
-            self.rival_fruits_score = 0
-            for fruit in self.rival_fruits_ate:
-                self.rival_fruits_score += self.rival_fruits_ate[fruit]
-
-    def get_best_common_ratio(self):
-        s = self.game_time
-        a1 = 0.25  # time for last move in seconds
-        q = 2
-        n = self.turns_left
-        best_s = 0
-        max_iterations = 20
-        factor = 0.5
-
-        for j in range(max_iterations):
-            for i in range(n):
-                best_s += (a1 * pow(q, i))
-            if (s-0.01) < best_s < s:
-                return q
-            if best_s < s:
-                q += factor
-            elif best_s > s:
-                q -= factor
-            factor /= 2
-            best_s = 0
-
-        return q
+        self.state.set_fruits(fruits_on_board_dict)
 
     ########## helper functions for AlphaBeta algorithm ##########
+    def futility_margin(self, state, next_pos):
+        return utils.h_futility_margin(state, next_pos, self.penalty_score)
+
     def utility(self, state):
-        my_pos = state[0]
-        rival_pos = state[1]
+        my_pos = state.pos
+        rival_pos = state.rival_pos
+
+        assert (state.board[my_pos] == 1)
+        assert (state.board[rival_pos] == 2)
 
-        assert (self.board[my_pos] == 1)
-        assert (self.board[rival_pos] == 2)
+        # once no fruit is left to reach, the exact result by the full rules of the end of the game
+        if self.tablebase is not None:
+            value = self.tablebase.utility(state, self.penalty_score)
+            if value is not None:
+                return value
 
-        my_moves = self.succ(my_pos)
-        rival_moves = self.succ(rival_pos)
+        my_moves = state.succ(my_pos)
+        rival_moves = state.succ(rival_pos)
         win, draw, lose = float('inf'), 0, float('-inf')
 
         if len(rival_moves) == 0 and len(my_moves) == 0:  # end of game and penalty goes to both
-            if self.fruits_score > self.rival_fruits_score:
+            if state.fruits_score > state.rival_fruits_score:
                 return win
-            elif self.fruits_score < self.rival_fruits_score:
+            elif state.fruits_score < state.rival_fruits_score:
                 return lose
             else:
                 return draw
         elif len(rival_moves) == 0 and len(my_moves) > 0:  # end of game and penalty goes to rival
-            if self.fruits_score + self.penalty_score > self.rival_fruits_score:
+            if state.fruits_score + self.penalty_score > state.rival_fruits_score:
                 return win
-            elif self.fruits_score + self.penalty_score < self.rival_fruits_score:
+            elif state.fruits_score + self.penalty_score < state.rival_fruits_score:
                 return lose
             else:
                 return draw
         elif len(my_moves) == 0 and len(rival_moves) > 0:  # end of game and penalty goes to me
-            if self.fruits_score > self.rival_fruits_score + self.penalty_score:
+            if state.fruits_score > state.rival_fruits_score + self.penalty_score:
                 return win
-            elif self.fruits_score < self.rival_fruits_score + self.penalty_score:
+            elif state.fruits_score < state.rival_fruits_score + self.penalty_score:
                 return lose
             else:
                 return draw
 
-        return utils.h_minimax(self, my_pos)
-
-    def succ(self, pos):
-        next_poses = []
-
-        for d in self.directions:
-            i = pos[0] + d[0]
-            j = pos[1] + d[1]
-
-            # check legal move
-            if 0 <= i < len(self.board) and 0 <= j < len(self.board[0]) and (self.board[i][j] not in [-1, 1, 2]):
-                next_pos = (i, j)
-                next_poses.append(next_pos)
-
-        return next_poses
-
-    def perform_move(self, pos, next_pos):
-        assert (self.board[pos] in [1, 2])
-        assert (self.board[next_pos] not in [1, 2])
-
-        player_index = self.board[pos]
-
-        if self.board[next_pos] != -1:  # moving forward
-            self.board[pos] = -1
-            if next_pos in self.fruits_dict:
-                fruit_val = self.fruits_dict.pop(next_pos)
-                if player_index == 1:
-                    self.fruits_ate[next_pos] = fruit_val
-                elif player_index == 2:
-                    self.rival_fruits_ate[next_pos] = fruit_val
-
-        else:  # returning backward
-            if pos in self.fruits_ate:
-                fruit_val = self.fruits_ate.pop(pos)
-                self.board[pos] = fruit_val
-                self.fruits_dict[pos] = fruit_val
-            elif pos in self.rival_fruits_ate:
-                fruit_val = self.rival_fruits_ate.pop(pos)
-                self.board[pos] = fruit_val
-                self.fruits_dict[pos] = fruit_val
-            else:
-                self.board[pos] = 0
-
-        self.board[next_pos] = player_index
-
-        if player_index == 1:
-            self.pos = next_pos
-        elif player_index == 2:
-            self.rival_pos = next_pos
-
-        self.update_fruits_scores(player_index)
+        return utils.h_minimax(state, my_pos, self.penalty_score, cache=self.eval_cache)
@@ -0,0 +1,127 @@
+"""
+Monte Carlo Tree Search Player
+"""
+from players.AbstractPlayer import AbstractPlayer
+from Endgame import EndgameSolver
+from GameState import GameState
+from Playouts import BatchPlayouts
+from SearchAlgos import MCTS
+import operator
+import time
+import random
+
+
+class Player(AbstractPlayer):
+    # the number of playouts played at once (by BatchPlayouts) from a new node of the tree,
+    # 0 for the one at a time random playouts of MCTS
+    playout_batch = 64
+    # 'random' or 'greedy' (SimplePlayer moves), see BatchPlayouts
+    playout_policy = 'random'
+
+    def __init__(self, game_time, penalty_score):
+        AbstractPlayer.__init__(self, game_time,
+                                penalty_score)  # keep the inheritance of the parent's (AbstractPlayer) __init__()
+        self.penalty_score = penalty_score
+        self.board = None
+        self.state = None
+        self.endgame = None
+        self.mcts = None
+        self.playouts = None
+        self.first_player = None
+
+    def set_game_params(self, board):
+        """Set the game parameters needed for this player.
+        This function is called before the game starts.
+        (See GameWrapper.py for more info where it is called)
+        input:
+            - board: np.array, a 2D matrix of the board.
+        No output is expected.
+        """
+        self.board = board
+        self.state = GameState(board)
+        self.endgame = EndgameSolver(board, self.penalty_score)
+        self.playouts = BatchPlayouts(board.shape, self.penalty_score, self.playout_policy)
+        # the tree is kept for the whole game, its root follows the played moves
+        self.mcts = MCTS(self.utility, self.state.succ, self.state.perform_move, None,
+                         self.playout if self.playout_batch else None)
+
+    def make_move(self, time_limit, players_score):
+        """Make move with this Player.
+        input:
+            - time_limit: float, time limit for a single turn.
+        output:
+            - direction: tuple, specifing the Player's movement, chosen from self.directions
+        """
+        start_time = time.time()
+        self.state.start_time, self.state.time_limit = start_time, time_limit
+        if self.first_player is None:
+            self.first_player = 1 if self.state.undo_depth == 0 else 2
+        # once the players are walled off from each other the move is solved instead of searched
+        best_direction = self.endgame.solve(self.state)
+        if best_direction is None:
+            self.mcts.new_search()
+            win_rate, best_direction = self.mcts.search(self.state, maximizing_player=True)
+
+        if best_direction is None:  # no search was completed in time
+            available_moves = self.state.succ(self.state.pos)
+            random.shuffle(available_moves)
+            best_direction = tuple(map(operator.sub, available_moves[0], self.state.pos))
+
+        i = self.state.pos[0] + best_direction[0]
+        j = self.state.pos[1] + best_direction[1]
+
+        self.state.apply(1, (i, j))
+        self.mcts.advance((i, j))
+
+        return best_direction
+
+    def set_rival_move(self, pos):
+        """Update your info, given the new position of the rival.
+        input:
+            - pos: tuple, the new position of the rival.
+        No output is expected
+        """
+        self.state.apply(2, pos)
+        self.mcts.advance(pos)
+
+    def update_fruits(self, fruits_on_board_dict):
+        """Update your info on the current fruits on board (if needed).
+        input:
+            - fruits_on_board_dict: dict of {pos: value}
+                                    where 'pos' is a tuple describing the fruit's position on board,
+                                    'value' is the value of this fruit.
+        No output is expected.
+        """
+        self.state.set_fruits(fruits_on_board_dict)
+
+    ########## helper functions for MCTS algorithm ##########
+    def playout(self, state, maximizing_player):
+        results, _ = self.playouts.play(state, maximizing_player, self.first_player, self.playout_batch)
+        return results.mean()
+
+    def utility(self, state, maximizing_player):
+        # the player to move is stuck and penalized. If it moved first in the game the other one still plays
+        # the turn of the round: it is penalized if it is stuck too, else it eats the best fruit next to it
+        score = state.fruits_score
+        rival_score = state.rival_fruits_score
+        mover = 1 if maximizing_player else 2
+        other_moves = state.succ(state.rival_pos if maximizing_player else state.pos)
+        last_turn = 0
+        if mover == self.first_player:
+            if not other_moves:
+                last_turn = -self.penalty_score
+            elif state.undo_depth + 1 < self.playouts.fruits_moves:  # the turn of the stuck player ages the fruits too
+                last_turn = max(state.board[next_pos] if state.board[next_pos] > 2 else 0 for next_pos in other_moves)
+        if maximizing_player:
+            score -= self.penalty_score
+            rival_score += last_turn
+        else:
+            rival_score -= self.penalty_score
+            score += last_turn
+
+        if score > rival_score:
+            return 1
+        elif score < rival_score:
+            return 0
+        else:
+            return 0.5
@@ -1,5 +1,6 @@
 from players.AbstractPlayer import AbstractPlayer
 import numpy as np
+import utils
 
 
 class Player(AbstractPlayer):
@@ -7,6 +8,7 @@ class Player(AbstractPlayer):
         AbstractPlayer.__init__(self, game_time, penalty_score)  # keep the inheritance of the parent's (AbstractPlayer) __init__()
         self.board = None             # and add two more fields to Player
         self.pos = None
+        self.neighbors = None
         
 
     def set_game_params(self, board):
@@ -14,16 +16,14 @@ class Player(AbstractPlayer):
         pos = np.where(board == 1)
         # convert pos to tuple of ints
         self.pos = tuple(ax[0] for ax in pos)
+        self.neighbors = utils.neighbor_table(board.shape)
 
 
     def state_score(self, board, pos):
         num_steps_available = 0
-        for d in self.directions:
-            i = pos[0] + d[0]
-            j = pos[1] + d[1]
-
+        for i, j in self.neighbors[pos]:
             # check legal move
-            if 0 <= i < len(board) and 0 <= j < len(board[0]) and (board[i][j] not in [-1, 1, 2]): 
+            if board[i][j] not in [-1, 1, 2]:
                 num_steps_available += 1
 
         if num_steps_available == 0:
@@ -47,11 +47,10 @@ class Player(AbstractPlayer):
         assert self.count_ones(self.board) == 0
 
         best_move, best_move_score, best_new_pos = None, float('-inf'), None
-        for d in self.directions:
-            i = self.pos[0] + d[0]
-            j = self.pos[1] + d[1]
+        for i, j in self.neighbors[self.pos]:
+            d = (i - self.pos[0], j - self.pos[1])
 
-            if 0 <= i < len(self.board) and 0 <= j < len(self.board[0]) and (self.board[i][j] not in [-1, 1, 2]):   # then move is legal
+            if self.board[i][j] not in [-1, 1, 2]:   # then move is legal
                 new_pos = (i, j)
                 self.board[new_pos] = 1
                 assert self.count_ones(self.board) == 1
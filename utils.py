@@ -1,6 +1,8 @@
+from collections import OrderedDict, deque
 import operator
 import numpy as np
 import os
+import random
 
 
 ALPHA_VALUE_INIT = -np.inf
@@ -13,6 +15,35 @@ def get_directions():
     return [(1, 0), (0, 1), (-1, 0), (0, -1)]
 
 
+_neighbor_tables = {}
+
+
+def neighbor_table(shape):
+    """Returns the precomputed neighbors of every cell of a board of the given shape, as a dict of
+    {pos: tuple of the positions on board one step away}, in the order of get_directions().
+    The board geometry does not change during a game, so a table is built once per shape and the same
+    table is shared by the game and all the players; a legal move is a lookup in it and a check of the cell.
+    """
+    shape = tuple(int(n) for n in shape)
+    table = _neighbor_tables.get(shape)
+    if table is None:
+        height, width = shape
+        table = {}
+        for i in range(height):
+            for j in range(width):
+                table[(i, j)] = tuple((i + d[0], j + d[1]) for d in get_directions()
+                                      if 0 <= i + d[0] < height and 0 <= j + d[1] < width)
+        _neighbor_tables[shape] = table
+    return table
+
+
+def board_fingerprint(board):
+    """Returns a hash of the blocked cells of a board, that identifies the board of a game
+    (e.g. to find the files precomputed for it in the boards directory).
+    """
+    return Zobrist(board.shape).full_hash(np.where(board == -1, -1, 0), {}, {}, {})
+
+
 def tup_add(t1, t2):
     """
     returns the sum of two tuples as tuple.
@@ -20,6 +51,39 @@ def tup_add(t1, t2):
     return tuple(map(operator.add, t1, t2))
 
 
+class Zobrist:
+    """Random 64-bit keys for Zobrist hashing of a game position: the XOR of the keys of its blocked cells,
+    both players positions, the fruits on board and the eaten ones, so a move updates the hash in O(1).
+    """
+    def __init__(self, shape, seed=0):
+        rand = random.Random(seed)
+        cells = [(i, j) for i in range(shape[0]) for j in range(shape[1])]
+        self.blocked = {cell: rand.getrandbits(64) for cell in cells}
+        self.fruit = {cell: rand.getrandbits(64) for cell in cells}
+        self.player = {1: {cell: rand.getrandbits(64) for cell in cells},
+                       2: {cell: rand.getrandbits(64) for cell in cells}}
+        self.ate = {1: {cell: rand.getrandbits(64) for cell in cells},
+                    2: {cell: rand.getrandbits(64) for cell in cells}}
+        self.side = rand.getrandbits(64)  # xor-ed in when it is the rival's turn
+
+    def full_hash(self, board, fruits_dict, fruits_ate, rival_fruits_ate):
+        """Returns the hash of a position computed from scratch.
+        """
+        key = 0
+        for i, j in zip(*np.where(board == -1)):
+            key ^= self.blocked[(i, j)]
+        for player_index in [1, 2]:
+            for i, j in zip(*np.where(board == player_index)):
+                key ^= self.player[player_index][(i, j)]
+        for pos in fruits_dict:
+            key ^= self.fruit[pos]
+        for pos in fruits_ate:
+            key ^= self.ate[1][pos]
+        for pos in rival_fruits_ate:
+            key ^= self.ate[2][pos]
+        return key
+
+
 def get_board_from_csv(board_file_name):
     """Returns the board data that is saved as a csv file in 'boards' folder.
     The board data is a list that contains: 
@@ -28,7 +92,8 @@ def get_board_from_csv(board_file_name):
         [2] starts poses of the players
     """
     board_path = os.path.join('boards', board_file_name)
-    board = np.loadtxt(open(board_path, "rb"), delimiter=" ")
+    with open(board_path, "rb") as board_file:
+        board = np.loadtxt(board_file, delimiter=" ")
     
     # mirror board
     board = np.flipud(board)
@@ -47,17 +112,48 @@ def get_board_from_csv(board_file_name):
     return [(i, j), blocks, [start_player_1, start_player_2]]
 
 
-def h_successors_by_depth(player, pos, depth):
-    queue = [pos]
+class EvalCache:
+    """A size bounded cache of evaluations keyed by a position hash, the least recently used entry is evicted.
+    """
+
+    def __init__(self, max_entries=2 ** 16):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, key):
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return value
+
+    def store(self, key, value):
+        self.entries[key] = value
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+def h_successors_by_depth(state, pos, depth):
+    queue = deque([pos])
+    visited = {pos}
     count_successors = 0
 
     while queue:
-        s = queue.pop(0)
+        s = queue.popleft()
         count_successors += 1
-        for i in player.succ(s):
-            if player.board[i] != -2:
+        for i in state.succ(s):
+            if i not in visited:
                 queue.append(i)
-                player.board[i] = -2
+                visited.add(i)
         depth -= 1
         if depth <= 0:
             break
@@ -65,27 +161,97 @@ def h_successors_by_depth(player, pos, depth):
     return count_successors
 
 
-def h_dist_from_rival(player):
-    pos1 = player.pos
-    pos2 = player.rival_pos
+def expand(cells):
+    """Returns the mask of the cells next to the given ones (a boolean 2D array).
+    """
+    neighbors = np.zeros_like(cells)
+    neighbors[1:] |= cells[:-1]
+    neighbors[:-1] |= cells[1:]
+    neighbors[:, 1:] |= cells[:, :-1]
+    neighbors[:, :-1] |= cells[:, 1:]
+    return neighbors
+
+
+def voronoi_territory(board, pos, rival_pos, max_count=None):
+    """Returns the number of free cells the player at pos reaches before the rival, and the number of free cells
+    the rival reaches first. Both BFS run at once, a whole frontier per step with shifted boolean masks.
+    A cell reached by both in the same step belongs to neither.
+    max_count: the BFS stops once the player owns max_count cells and its count is capped to it, None for no limit.
+    """
+    free = (board != -1) & (board != 1) & (board != 2)
+    frontier, rival_frontier = np.zeros(board.shape, dtype=bool), np.zeros(board.shape, dtype=bool)
+    frontier[pos] = True
+    rival_frontier[rival_pos] = True
+    unreached = free.copy()
+    count, rival_count = 0, 0
+
+    while frontier.any() or rival_frontier.any():
+        frontier = expand(frontier) & unreached
+        rival_frontier = expand(rival_frontier) & unreached
+        unreached &= ~(frontier | rival_frontier)
+        contested = np.count_nonzero(frontier & rival_frontier)
+        count += np.count_nonzero(frontier) - contested
+        rival_count += np.count_nonzero(rival_frontier) - contested
+        if max_count is not None and count >= max_count:
+            return max_count, rival_count
+
+    return count, rival_count
+
+
+def h_territory(state, pos):
+    """The number of cells the player at pos owns: the free cells it reaches before the rival, at most min(shape)
+    as h_successors_by_depth counts in h_minimax.
+    """
+    rival_pos = state.rival_pos if pos == state.pos else state.pos
+    return voronoi_territory(state.board, pos, rival_pos, min(state.board.shape))[0]
+
+
+def h_dist_from_rival(state):
+    pos1 = state.pos
+    pos2 = state.rival_pos
     return np.abs(pos1[0] - pos2[0]) + np.abs(pos1[1] - pos2[1])
 
 
-def h_directions_diff(player):
-    return len(player.succ(player.pos)) - len(player.succ(player.rival_pos))
+def h_directions_diff(state):
+    return len(state.succ(state.pos)) - len(state.succ(state.rival_pos))
+
+
+def h_diff_fruits_values(state, pos):
+    assert state.board[pos] in [1, 2]
+    if state.board[pos] == 1:
+        return state.fruits_score - state.rival_fruits_score
+    elif state.board[pos] == 2:
+        return state.rival_fruits_score - state.fruits_score
 
 
-def h_diff_fruits_values(player, pos):
-    assert player.board[pos] in [1, 2]
-    if player.board[pos] == 1:
-        return player.fruits_score - player.rival_fruits_score
-    elif player.board[pos] == 2:
-        return player.rival_fruits_score - player.fruits_score
+def h_futility_margin(state, next_pos, penalty_score, margin=1.0):
+    """Returns how much h_minimax may change by the move to next_pos, for futility pruning:
+    the h_diff_fruits_values term changes by the value of the fruit in next_pos (if any),
+    the other terms by less than margin for almost all moves.
+    """
+    fruit_value = state.board[next_pos] if state.board[next_pos] > 2 else 0
+    return margin + fruit_value / penalty_score
+
+
+def h_minimax(state, pos, penalty_score, territory=False, cache=None):
+    """cache: EvalCache of the values of a hashed state, for the same penalty_score and territory. None to not cache.
+    """
+    key = None
+    if cache is not None:
+        key = state.key if pos == state.pos else state.key ^ state.zobrist.side
+        value = cache.lookup(key)
+        if value is not None:
+            return value
 
+    if territory:
+        v1 = h_territory(state, pos)
+    else:
+        v1 = h_successors_by_depth(state, pos, min(state.board.shape))
+    v2 = h_dist_from_rival(state) / state.board.size
+    v3 = h_directions_diff(state) / 3
+    v4 = h_diff_fruits_values(state, pos) / penalty_score
+    value = v1 - v2 + v3 + v4
 
-def h_minimax(player, pos):
-    v1 = h_successors_by_depth(player, pos, min(player.board.shape))
-    v2 = h_dist_from_rival(player) / player.board.size
-    v3 = h_directions_diff(player) / 3
-    v4 = h_diff_fruits_values(player, pos) / player.penalty_score
-    return v1 - v2 + v3 + v4
+    if cache is not None:
+        cache.store(key, value)
+    return value